@@ -1,4 +1,5 @@
 import faulthandler
+import multiprocessing as mp
 import threading
 
 from flask import cli
@@ -12,6 +13,9 @@ threading.current_thread().name = "frigate"
 cli.show_server_banner = lambda *x: None
 
 if __name__ == "__main__":
+    # processes are forked so they share the modules imported by the main process
+    mp.set_start_method("fork", force=True)
+
     frigate_app = FrigateApp()
 
     frigate_app.start()
@@ -1,33 +1,30 @@
 import argparse
 import datetime
+import importlib
 import logging
 import multiprocessing as mp
 import os
 import secrets
 import shutil
 import signal
+import sqlite3
 import sys
+import threading
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import Queue
 from multiprocessing.synchronize import Event as MpEvent
 from types import FrameType
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Optional
 
-import psutil
-from peewee_migrate import Router
+import numpy as np
+from peewee import OperationalError
 from playhouse.sqlite_ext import SqliteExtDatabase
 from playhouse.sqliteq import SqliteQueueDatabase
 from pydantic import ValidationError
 
-from frigate.api.app import create_app
-from frigate.api.auth import hash_password
-from frigate.comms.config_updater import ConfigPublisher
-from frigate.comms.dispatcher import Communicator, Dispatcher
-from frigate.comms.inter_process import InterProcessCommunicator
-from frigate.comms.mqtt import MqttClient
-from frigate.comms.webpush import WebPushClient
-from frigate.comms.ws import WebSocketClient
-from frigate.comms.zmq_proxy import ZmqProxy
+from frigate.comms.ring import SharedFrameRing, SharedRing
 from frigate.config import FrigateConfig
 from frigate.const import (
     CACHE_DIR,
@@ -38,11 +35,6 @@ from frigate.const import (
     MODEL_CACHE_DIR,
     RECORD_DIR,
 )
-from frigate.embeddings import EmbeddingsContext, manage_embeddings
-from frigate.events.audio import listen_to_audio
-from frigate.events.cleanup import EventCleanup
-from frigate.events.external import ExternalEventProcessor
-from frigate.events.maintainer import EventProcessor
 from frigate.log import log_process, root_configurer
 from frigate.models import (
     Event,
@@ -55,42 +47,73 @@ from frigate.models import (
     Timeline,
     User,
 )
-from frigate.object_detection import ObjectDetectProcess
-from frigate.object_processing import TrackedObjectProcessor
-from frigate.output.output import output_frames
 from frigate.plus import PlusApi
-from frigate.ptz.autotrack import PtzAutoTrackerThread
-from frigate.ptz.onvif import OnvifController
-from frigate.record.cleanup import RecordingCleanup
-from frigate.record.export import migrate_exports
-from frigate.record.record import manage_recordings
-from frigate.review.review import manage_review_segments
-from frigate.stats.emitter import StatsEmitter
-from frigate.stats.util import stats_init
-from frigate.storage import StorageMaintainer
-from frigate.timeline import TimelineProcessor
-from frigate.types import CameraMetricsTypes, PTZMetricsTypes
-from frigate.util.builtin import empty_and_close_queue, save_default_config
-from frigate.util.config import migrate_frigate_config
-from frigate.util.object import get_camera_regions_grid
+from frigate.util.builtin import discard_and_close_queue, save_default_config
+from frigate.util.config import (
+    load_cached_config,
+    migrate_frigate_config,
+    save_cached_config,
+)
+from frigate.util.metrics import SharedMetrics
 from frigate.version import VERSION
-from frigate.video import capture_camera, track_camera
-from frigate.watchdog import FrigateWatchdog
+
+if TYPE_CHECKING:
+    from frigate.comms.dispatcher import Communicator
+    from frigate.object_detection import ObjectDetectProcess
+    from frigate.types import CameraMetricsTypes, PTZMetricsTypes
 
 logger = logging.getLogger(__name__)
 
+# modules used by the forked processes and the startup stages, these are
+# imported once before forking so the processes share the pages instead of
+# importing them again. the stages run on threads while other stages fork,
+# so every module they import must already be loaded, otherwise a child can
+# be forked while another thread holds an import lock
+PRELOAD_MODULES = [
+    "cv2",
+    "numpy",
+    "frigate.api.app",
+    "frigate.api.auth",
+    "frigate.embeddings",
+    "frigate.events.audio",
+    "frigate.events.cleanup",
+    "frigate.events.external",
+    "frigate.events.maintainer",
+    "frigate.object_detection",
+    "frigate.object_processing",
+    "frigate.output.output",
+    "frigate.ptz.autotrack",
+    "frigate.record.cleanup",
+    "frigate.record.record",
+    "frigate.review.review",
+    "frigate.stats.emitter",
+    "frigate.stats.util",
+    "frigate.storage",
+    "frigate.timeline",
+    "frigate.util.object",
+    "frigate.util.services",
+    "frigate.video",
+    "frigate.watchdog",
+]
+
+# up to 4MB of log messages waiting to be written
+LOG_RING_CAPACITY = 1024
+LOG_RING_SLOT_BYTES = 4096
+
+# enough for the detections, motion boxes and regions of a single frame
+DETECTED_FRAMES_SLOT_BYTES = 64 * 1024
+
 
 class FrigateApp:
     def __init__(self) -> None:
         self.stop_event: MpEvent = mp.Event()
         self.detection_queue: Queue = mp.Queue()
-        self.detectors: dict[str, ObjectDetectProcess] = {}
+        self.detectors: dict[str, "ObjectDetectProcess"] = {}
         self.detection_out_events: dict[str, MpEvent] = {}
         self.detection_shms: list[mp.shared_memory.SharedMemory] = []
-        self.log_queue: Queue = mp.Queue()
         self.plus_api = PlusApi()
-        self.camera_metrics: dict[str, CameraMetricsTypes] = {}
-        self.ptz_metrics: dict[str, PTZMetricsTypes] = {}
+        self.camera_metrics: dict[str, "CameraMetricsTypes"] = {}
+        self.ptz_metrics: dict[str, "PTZMetricsTypes"] = {}
         self.processes: dict[str, int] = {}
         self.region_grids: dict[str, list[list[dict[str, int]]]] = {}
 
@@ -107,13 +130,17 @@ class FrigateApp:
             MODEL_CACHE_DIR,
             EXPORT_DIR,
         ]:
-            if not os.path.exists(d) and not os.path.islink(d):
-                logger.info(f"Creating directory: {d}")
-                os.makedirs(d)
-            else:
+            try:
+                os.makedirs(d, exist_ok=True)
+                logger.debug(f"Ensured directory: {d}")
+            except FileExistsError:
+                # a file or dangling symlink is in the way, leave it as is
                 logger.debug(f"Skipping directory: {d}")
 
     def init_logger(self) -> None:
+        self.log_queue: SharedRing = SharedRing(
+            capacity=LOG_RING_CAPACITY, slot_bytes=LOG_RING_SLOT_BYTES
+        )
         self.log_process = mp.Process(
             target=log_process, args=(self.log_queue,), name="log_process"
         )
@@ -138,66 +165,54 @@ class FrigateApp:
         # check if the config file needs to be migrated
         migrate_frigate_config(config_file)
 
-        user_config = FrigateConfig.parse_file(config_file)
+        user_config = load_cached_config(config_file)
+
+        if user_config is None:
+            user_config = FrigateConfig.parse_file(config_file)
+            save_cached_config(config_file, user_config)
+
         self.config = user_config.runtime_config(self.plus_api)
+        self.enabled_cameras = [
+            camera for camera in self.config.cameras.values() if camera.enabled
+        ]
+
+    def init_camera_metrics(self) -> None:
+        # numeric metrics for all cameras share a single block of shared memory
+        self.shared_metrics = SharedMetrics(len(self.config.cameras))
 
-        for camera_name in self.config.cameras.keys():
+        for index, camera_name in enumerate(self.config.cameras.keys()):
             # create camera_metrics
             self.camera_metrics[camera_name] = {
-                "camera_fps": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
-                # issue https://github.com/python/typeshed/issues/8799
-                # from mypy 0.981 onwards
-                "skipped_fps": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
-                # issue https://github.com/python/typeshed/issues/8799
-                # from mypy 0.981 onwards
-                "process_fps": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
-                "detection_fps": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
-                # issue https://github.com/python/typeshed/issues/8799
-                # from mypy 0.981 onwards
-                "detection_frame": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
-                # issue https://github.com/python/typeshed/issues/8799
-                # from mypy 0.981 onwards
-                "read_start": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
-                # issue https://github.com/python/typeshed/issues/8799
-                # from mypy 0.981 onwards
-                "ffmpeg_pid": mp.Value("i", 0),  # type: ignore[typeddict-item]
-                # issue https://github.com/python/typeshed/issues/8799
-                # from mypy 0.981 onwards
-                "frame_queue": mp.Queue(maxsize=2),
+                "camera_fps": self.shared_metrics.value(index, "camera_fps"),
+                "skipped_fps": self.shared_metrics.value(index, "skipped_fps"),
+                "process_fps": self.shared_metrics.value(index, "process_fps"),
+                "detection_fps": self.shared_metrics.value(index, "detection_fps"),
+                "detection_frame": self.shared_metrics.value(index, "detection_frame"),
+                "read_start": self.shared_metrics.value(index, "read_start"),
+                "ffmpeg_pid": self.shared_metrics.value(index, "ffmpeg_pid"),
+                "frame_queue": SharedFrameRing(capacity=2),
                 "capture_process": None,
                 "process": None,
-                "audio_rms": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
-                "audio_dBFS": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
+                "audio_rms": self.shared_metrics.value(index, "audio_rms"),
+                "audio_dBFS": self.shared_metrics.value(index, "audio_dBFS"),
             }
             self.ptz_metrics[camera_name] = {
-                "ptz_autotracker_enabled": mp.Value(  # type: ignore[typeddict-item]
-                    # issue https://github.com/python/typeshed/issues/8799
-                    # from mypy 0.981 onwards
-                    "i",
-                    self.config.cameras[camera_name].onvif.autotracking.enabled,
+                "ptz_autotracker_enabled": self.shared_metrics.value(
+                    index, "ptz_autotracker_enabled"
                 ),
                 "ptz_tracking_active": mp.Event(),
                 "ptz_motor_stopped": mp.Event(),
                 "ptz_reset": mp.Event(),
-                "ptz_start_time": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
-                # issue https://github.com/python/typeshed/issues/8799
-                # from mypy 0.981 onwards
-                "ptz_stop_time": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
-                # issue https://github.com/python/typeshed/issues/8799
-                # from mypy 0.981 onwards
-                "ptz_frame_time": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
-                # issue https://github.com/python/typeshed/issues/8799
-                # from mypy 0.981 onwards
-                "ptz_zoom_level": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
-                # issue https://github.com/python/typeshed/issues/8799
-                # from mypy 0.981 onwards
-                "ptz_max_zoom": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
-                # issue https://github.com/python/typeshed/issues/8799
-                # from mypy 0.981 onwards
-                "ptz_min_zoom": mp.Value("d", 0.0),  # type: ignore[typeddict-item]
-                # issue https://github.com/python/typeshed/issues/8799
-                # from mypy 0.981 onwards
+                "ptz_start_time": self.shared_metrics.value(index, "ptz_start_time"),
+                "ptz_stop_time": self.shared_metrics.value(index, "ptz_stop_time"),
+                "ptz_frame_time": self.shared_metrics.value(index, "ptz_frame_time"),
+                "ptz_zoom_level": self.shared_metrics.value(index, "ptz_zoom_level"),
+                "ptz_max_zoom": self.shared_metrics.value(index, "ptz_max_zoom"),
+                "ptz_min_zoom": self.shared_metrics.value(index, "ptz_min_zoom"),
             }
+            self.ptz_metrics[camera_name][
+                "ptz_autotracker_enabled"
+            ].value = self.config.cameras[camera_name].onvif.autotracking.enabled
             self.ptz_metrics[camera_name]["ptz_motor_stopped"].set()
 
     def set_log_levels(self) -> None:
@@ -212,24 +227,28 @@ class FrigateApp:
             logging.getLogger("ws4py").setLevel("ERROR")
 
     def init_queues(self) -> None:
-        # Queue for cameras to push tracked objects to
-        self.detected_frames_queue: Queue = mp.Queue(
-            maxsize=sum(camera.enabled for camera in self.config.cameras.values()) * 2
+        # Ring for cameras to push tracked objects to
+        self.detected_frames_queue: SharedRing = SharedRing(
+            capacity=len(self.enabled_cameras) * 2,
+            slot_bytes=DETECTED_FRAMES_SLOT_BYTES,
         )
 
         # Queue for timeline events
         self.timeline_queue: Queue = mp.Queue()
 
     def init_database(self) -> None:
-        def vacuum_db(db: SqliteExtDatabase) -> None:
-            logger.info("Running database vacuum")
-            db.execute_sql("VACUUM;")
+        from peewee_migrate import Router
 
-            try:
-                with open(f"{CONFIG_DIR}/.vacuum", "w") as f:
-                    f.write(str(datetime.datetime.now().timestamp()))
-            except PermissionError:
-                logger.error("Unable to write to /config to save DB state")
+        def backup_db(path: str, backup_path: str) -> None:
+            # the online backup api copies the db page by page
+            source = sqlite3.connect(path)
+            backup = sqlite3.connect(backup_path)
+
+            with backup:
+                source.backup(backup)
+
+            backup.close()
+            source.close()
 
         def cleanup_timeline_db(db: SqliteExtDatabase) -> None:
             db.execute_sql(
@@ -250,20 +269,30 @@ class FrigateApp:
             os.rename(old_db_path, self.config.database.path)
 
         # Migrate DB schema
-        migrate_db = SqliteExtDatabase(self.config.database.path)
+        migrate_db = SqliteExtDatabase(
+            self.config.database.path,
+            pragmas={
+                "journal_mode": "wal",
+                "temp_store": "memory",
+                "mmap_size": 256 * 1024 * 1024,  # 256MB
+            },
+        )
 
         # Run migrations
         del logging.getLogger("peewee_migrate").handlers[:]
         router = Router(migrate_db)
 
-        if len(router.diff) > 0:
+        # computing the diff reads the migrations dir and the migrate history,
+        # only run the migrations when there are any so it is computed once
+        # on a regular start
+        if router.diff:
             logger.info("Making backup of DB before migrations...")
-            shutil.copyfile(
+            backup_db(
                 self.config.database.path,
                 self.config.database.path.replace("frigate.db", "backup.db"),
             )
 
-        router.run()
+            router.run()
 
         # this is a temporary check to clean up user DB from beta
         # will be removed before final release
@@ -271,6 +300,8 @@ class FrigateApp:
             cleanup_timeline_db(migrate_db)
 
         # check if vacuum needs to be run
+        self.vacuum_needed = True
+
         if os.path.exists(f"{CONFIG_DIR}/.vacuum"):
             with open(f"{CONFIG_DIR}/.vacuum") as f:
                 try:
@@ -278,25 +309,69 @@ class FrigateApp:
                 except Exception:
                     timestamp = 0
 
-                if (
+                self.vacuum_needed = (
                     timestamp
                     < (
                         datetime.datetime.now() - datetime.timedelta(weeks=2)
                     ).timestamp()
-                ):
-                    vacuum_db(migrate_db)
-        else:
-            vacuum_db(migrate_db)
+                )
 
         migrate_db.close()
 
+    def start_database_vacuum(self) -> None:
+        """Vacuum the db in the background so it does not block startup."""
+        if not self.vacuum_needed:
+            return
+
+        def vacuum_db() -> None:
+            # the vacuum holds the write lock until it finishes, the other
+            # connections wait for it up to their busy timeout
+            db = SqliteExtDatabase(
+                self.config.database.path,
+                timeout=max(60, 10 * len(self.enabled_cameras)),
+            )
+            logger.info("Running database vacuum")
+
+            try:
+                db.execute_sql("VACUUM;")
+            except OperationalError as e:
+                logger.error(f"Database vacuum failed: {e}")
+                return
+            finally:
+                db.close()
+
+            logger.info("Database vacuum finished")
+
+            try:
+                with open(f"{CONFIG_DIR}/.vacuum", "w") as f:
+                    f.write(str(datetime.datetime.now().timestamp()))
+            except PermissionError:
+                logger.error("Unable to write to /config to save DB state")
+
+        threading.Thread(target=vacuum_db, name="db_vacuum", daemon=True).start()
+
     def init_go2rtc(self) -> None:
-        for proc in psutil.process_iter(["pid", "name"]):
-            if proc.info["name"] == "go2rtc":
-                logger.info(f"go2rtc process pid: {proc.info['pid']}")
-                self.processes["go2rtc"] = proc.info["pid"]
+        # read the process names directly instead of creating a psutil
+        # process for every pid on the system
+        for pid in os.listdir("/proc"):
+            if not pid.isdigit():
+                continue
+
+            try:
+                with open(f"/proc/{pid}/comm") as f:
+                    name = f.read().rstrip()
+            except OSError:
+                # process exited while iterating
+                continue
+
+            if name == "go2rtc":
+                logger.info(f"go2rtc process pid: {pid}")
+                self.processes["go2rtc"] = int(pid)
+                break
 
     def init_recording_manager(self) -> None:
+        from frigate.record.record import manage_recordings
+
         recording_process = mp.Process(
             target=manage_recordings,
             name="recording_manager",
@@ -309,6 +384,8 @@ class FrigateApp:
         logger.info(f"Recording process started: {recording_process.pid}")
 
     def init_review_segment_manager(self) -> None:
+        from frigate.review.review import manage_review_segments
+
         review_segment_process = mp.Process(
             target=manage_review_segments,
             name="review_segment_manager",
@@ -321,6 +398,8 @@ class FrigateApp:
         logger.info(f"Review process started: {review_segment_process.pid}")
 
     def init_embeddings_manager(self) -> None:
+        from frigate.embeddings import EmbeddingsContext, manage_embeddings
+
         if not self.config.semantic_search.enabled:
             self.embeddings = None
             return
@@ -348,9 +427,7 @@ class FrigateApp:
                 "cache_size": -512 * 1000,  # 512MB of cache,
                 "synchronous": "NORMAL",  # Safe when using WAL https://www.sqlite.org/pragma.html#pragma_synchronous
             },
-            timeout=max(
-                60, 10 * len([c for c in self.config.cameras.values() if c.enabled])
-            ),
+            timeout=max(60, 10 * len(self.enabled_cameras)),
         )
         models = [
             Event,
@@ -366,6 +443,8 @@ class FrigateApp:
         self.db.bind(models)
 
     def check_db_data_migrations(self) -> None:
+        from frigate.record.export import migrate_exports
+
         # check if vacuum needs to be run
         if not os.path.exists(f"{CONFIG_DIR}/.exports"):
             try:
@@ -377,14 +456,22 @@ class FrigateApp:
             migrate_exports(self.config.ffmpeg, self.config.cameras.keys())
 
     def init_external_event_processor(self) -> None:
+        from frigate.events.external import ExternalEventProcessor
+
         self.external_event_processor = ExternalEventProcessor(self.config)
 
     def init_inter_process_communicator(self) -> None:
+        from frigate.comms.config_updater import ConfigPublisher
+        from frigate.comms.inter_process import InterProcessCommunicator
+        from frigate.comms.zmq_proxy import ZmqProxy
+
         self.inter_process_communicator = InterProcessCommunicator()
         self.inter_config_updater = ConfigPublisher()
         self.inter_zmq_proxy = ZmqProxy()
 
     def init_web_server(self) -> None:
+        from frigate.api.app import create_app
+
         self.flask_app = create_app(
             self.config,
             self.db,
@@ -398,10 +485,17 @@ class FrigateApp:
         )
 
     def init_onvif(self) -> None:
+        from frigate.ptz.onvif import OnvifController
+
         self.onvif_controller = OnvifController(self.config, self.ptz_metrics)
 
     def init_dispatcher(self) -> None:
-        comms: list[Communicator] = []
+        from frigate.comms.dispatcher import Dispatcher
+        from frigate.comms.mqtt import MqttClient
+        from frigate.comms.webpush import WebPushClient
+        from frigate.comms.ws import WebSocketClient
+
+        comms: list["Communicator"] = []
 
         if self.config.mqtt.enabled:
             comms.append(MqttClient(self.config))
@@ -421,16 +515,17 @@ class FrigateApp:
         )
 
     def start_detectors(self) -> None:
+        from frigate.object_detection import ObjectDetectProcess
+
+        largest_frame = max(
+            det.model.height * det.model.width * 3
+            for det in self.config.detectors.values()
+        )
+
         for name in self.config.cameras.keys():
             self.detection_out_events[name] = mp.Event()
 
             try:
-                largest_frame = max(
-                    [
-                        det.model.height * det.model.width * 3
-                        for (name, det) in self.config.detectors.items()
-                    ]
-                )
                 shm_in = mp.shared_memory.SharedMemory(
                     name=name,
                     create=True,
@@ -455,9 +550,14 @@ class FrigateApp:
                 self.detection_queue,
                 self.detection_out_events,
                 detector_config,
+                self.config.scheduling.realtime_priority
+                if self.config.scheduling.realtime_detectors
+                else None,
             )
 
     def start_ptz_autotracker(self) -> None:
+        from frigate.ptz.autotrack import PtzAutoTrackerThread
+
         self.ptz_autotracker_thread = PtzAutoTrackerThread(
             self.config,
             self.onvif_controller,
@@ -468,6 +568,8 @@ class FrigateApp:
         self.ptz_autotracker_thread.start()
 
     def start_detected_frames_processor(self) -> None:
+        from frigate.object_processing import TrackedObjectProcessor
+
         self.detected_frames_processor = TrackedObjectProcessor(
             self.config,
             self.dispatcher,
@@ -478,6 +580,8 @@ class FrigateApp:
         self.detected_frames_processor.start()
 
     def start_video_output_processor(self) -> None:
+        from frigate.output.output import output_frames
+
         output_processor = mp.Process(
             target=output_frames,
             name="output_processor",
@@ -489,6 +593,8 @@ class FrigateApp:
         logger.info(f"Output process started: {output_processor.pid}")
 
     def init_historical_regions(self) -> None:
+        from frigate.util.object import get_camera_regions_grid
+
         # delete region grids for removed or renamed cameras
         cameras = list(self.config.cameras.keys())
         Regions.delete().where(~(Regions.camera << cameras)).execute()
@@ -502,6 +608,19 @@ class FrigateApp:
             )
 
     def start_camera_processors(self) -> None:
+        from frigate.util.services import get_physical_cores, set_process_affinity
+        from frigate.video import track_camera
+
+        self.camera_cpus: dict[str, set[int]] = {}
+
+        if self.config.scheduling.pin_cameras:
+            # round-robin over physical cores so the capture and processor of
+            # a camera share the caches of one core
+            cores = get_physical_cores()
+
+            for i, camera in enumerate(self.enabled_cameras):
+                self.camera_cpus[camera.name] = cores[i % len(cores)]
+
         for name, config in self.config.cameras.items():
             if not self.config.cameras[name].enabled:
                 logger.info(f"Camera processor not started for disabled camera {name}")
@@ -528,7 +647,13 @@ class FrigateApp:
             camera_process.start()
             logger.info(f"Camera processor started for {name}: {camera_process.pid}")
 
+            if name in self.camera_cpus and camera_process.pid is not None:
+                set_process_affinity(camera_process.pid, self.camera_cpus[name])
+
     def start_camera_capture_processes(self) -> None:
+        from frigate.util.services import set_process_affinity
+        from frigate.video import capture_camera
+
         for name, config in self.config.cameras.items():
             if not self.config.cameras[name].enabled:
                 logger.info(f"Capture process not started for disabled camera {name}")
@@ -544,9 +669,14 @@ class FrigateApp:
             capture_process.start()
             logger.info(f"Capture process started for {name}: {capture_process.pid}")
 
+            if name in self.camera_cpus and capture_process.pid is not None:
+                set_process_affinity(capture_process.pid, self.camera_cpus[name])
+
     def start_audio_processors(self) -> None:
+        from frigate.events.audio import listen_to_audio
+
         self.audio_process = None
-        if len([c for c in self.config.cameras.values() if c.audio.enabled]) > 0:
+        if any(camera.audio.enabled for camera in self.enabled_cameras):
             self.audio_process = mp.Process(
                 target=listen_to_audio,
                 name="audio_capture",
@@ -561,12 +691,16 @@ class FrigateApp:
             logger.info(f"Audio process started: {self.audio_process.pid}")
 
     def start_timeline_processor(self) -> None:
+        from frigate.timeline import TimelineProcessor
+
         self.timeline_processor = TimelineProcessor(
             self.config, self.timeline_queue, self.stop_event
         )
         self.timeline_processor.start()
 
     def start_event_processor(self) -> None:
+        from frigate.events.maintainer import EventProcessor
+
         self.event_processor = EventProcessor(
             self.config,
             self.timeline_queue,
@@ -575,18 +709,27 @@ class FrigateApp:
         self.event_processor.start()
 
     def start_event_cleanup(self) -> None:
+        from frigate.events.cleanup import EventCleanup
+
         self.event_cleanup = EventCleanup(self.config, self.stop_event)
         self.event_cleanup.start()
 
     def start_record_cleanup(self) -> None:
+        from frigate.record.cleanup import RecordingCleanup
+
         self.record_cleanup = RecordingCleanup(self.config, self.stop_event)
         self.record_cleanup.start()
 
     def start_storage_maintainer(self) -> None:
+        from frigate.storage import StorageMaintainer
+
         self.storage_maintainer = StorageMaintainer(self.config, self.stop_event)
         self.storage_maintainer.start()
 
     def start_stats_emitter(self) -> None:
+        from frigate.stats.emitter import StatsEmitter
+        from frigate.stats.util import stats_init
+
         self.stats_emitter = StatsEmitter(
             self.config,
             stats_init(
@@ -597,6 +740,8 @@ class FrigateApp:
         self.stats_emitter.start()
 
     def start_watchdog(self) -> None:
+        from frigate.watchdog import FrigateWatchdog
+
         self.frigate_watchdog = FrigateWatchdog(self.detectors, self.stop_event)
         self.frigate_watchdog.start()
 
@@ -610,17 +755,21 @@ class FrigateApp:
             min_req_shm += 8
 
         available_shm = total_shm - min_req_shm
-        cam_total_frame_size = 0
-
-        for camera in self.config.cameras.values():
-            if camera.enabled:
-                cam_total_frame_size += round(
-                    (camera.detect.width * camera.detect.height * 1.5 + 270480)
-                    / 1048576,
-                    1,
-                )
+        frame_sizes = np.fromiter(
+            (
+                camera.detect.width * camera.detect.height
+                for camera in self.enabled_cameras
+            ),
+            dtype=np.float64,
+        )
+        cam_total_frame_size = round(
+            float((frame_sizes * 1.5 + 270480).sum() / 1048576), 1
+        )
 
-        self.shm_frame_count = min(50, int(available_shm / (cam_total_frame_size)))
+        if cam_total_frame_size > 0:
+            self.shm_frame_count = min(50, int(available_shm / cam_total_frame_size))
+        else:
+            self.shm_frame_count = 50
 
         logger.debug(
             f"Calculated total camera size {available_shm} / {cam_total_frame_size} :: {self.shm_frame_count} frames for each camera in SHM"
@@ -632,40 +781,102 @@ class FrigateApp:
             )
 
     def init_auth(self) -> None:
-        if self.config.auth.enabled:
-            if User.select().count() == 0:
-                password = secrets.token_hex(16)
-                password_hash = hash_password(
-                    password, iterations=self.config.auth.hash_iterations
-                )
-                User.insert(
-                    {
-                        User.username: "admin",
-                        User.password_hash: password_hash,
-                    }
-                ).execute()
-
-                logger.info("********************************************************")
-                logger.info("********************************************************")
-                logger.info("***    Auth is enabled, but no users exist.          ***")
-                logger.info("***    Created a default user:                       ***")
-                logger.info("***    User: admin                                   ***")
-                logger.info(f"***    Password: {password}   ***")
-                logger.info("********************************************************")
-                logger.info("********************************************************")
-            elif self.config.auth.reset_admin_password:
-                password = secrets.token_hex(16)
-                password_hash = hash_password(
-                    password, iterations=self.config.auth.hash_iterations
+        from frigate.api.auth import hash_password
+
+        if not self.config.auth.enabled:
+            return
+
+        users_exist = User.select().exists()
+
+        # only generate and hash a password when the admin user needs one
+        if users_exist and not self.config.auth.reset_admin_password:
+            return
+
+        password = secrets.token_hex(16)
+        password_hash = hash_password(
+            password, iterations=self.config.auth.hash_iterations
+        )
+
+        if not users_exist:
+            User.insert(
+                {
+                    User.username: "admin",
+                    User.password_hash: password_hash,
+                }
+            ).execute()
+
+            logger.info("********************************************************")
+            logger.info("********************************************************")
+            logger.info("***    Auth is enabled, but no users exist.          ***")
+            logger.info("***    Created a default user:                       ***")
+            logger.info("***    User: admin                                   ***")
+            logger.info(f"***    Password: {password}   ***")
+            logger.info("********************************************************")
+            logger.info("********************************************************")
+        else:
+            User.replace(username="admin", password_hash=password_hash).execute()
+
+            logger.info("********************************************************")
+            logger.info("********************************************************")
+            logger.info("***    Reset admin password set in the config.       ***")
+            logger.info(f"***    Password: {password}   ***")
+            logger.info("********************************************************")
+            logger.info("********************************************************")
+
+    def preload_modules(self) -> None:
+        for module in PRELOAD_MODULES:
+            importlib.import_module(module)
+
+    def run_stages(
+        self, stages: list[tuple[str, list[str], Callable[[], None]]]
+    ) -> None:
+        """Run startup stages, stages with their dependencies met run concurrently."""
+        done: set[str] = set()
+        remaining = stages
+
+        while remaining:
+            layer = [stage for stage in remaining if set(stage[1]) <= done]
+
+            if not layer:
+                raise ValueError(
+                    f"Unable to resolve startup stages: {[stage[0] for stage in remaining]}"
                 )
-                User.replace(username="admin", password_hash=password_hash).execute()
 
-                logger.info("********************************************************")
-                logger.info("********************************************************")
-                logger.info("***    Reset admin password set in the config.       ***")
-                logger.info(f"***    Password: {password}   ***")
-                logger.info("********************************************************")
-                logger.info("********************************************************")
+            with ThreadPoolExecutor(max_workers=len(layer)) as executor:
+                futures = [executor.submit(stage[2]) for stage in layer]
+
+                # raise any exception from the stages in this layer
+                for future in futures:
+                    future.result()
+
+            done.update(stage[0] for stage in layer)
+            remaining = [stage for stage in remaining if stage[0] not in done]
+
+    def load_config(self) -> bool:
+        try:
+            self.init_config()
+            return True
+        except Exception as e:
+            print("*************************************************************")
+            print("*************************************************************")
+            print("***    Your config file is not valid!                     ***")
+            print("***    Please check the docs at                           ***")
+            print("***    https://docs.frigate.video/configuration/index     ***")
+            print("*************************************************************")
+            print("*************************************************************")
+            print("***    Config Validation Errors                           ***")
+            print("*************************************************************")
+            if isinstance(e, ValidationError):
+                for error in e.errors():
+                    location = ".".join(str(item) for item in error["loc"])
+                    print(f"{location}: {error['msg']}")
+            else:
+                print(e)
+                print(traceback.format_exc())
+            print("*************************************************************")
+            print("***    End Config Validation Errors                       ***")
+            print("*************************************************************")
+            return False
 
     def start(self) -> None:
         parser = argparse.ArgumentParser(
@@ -675,51 +886,44 @@ class FrigateApp:
         parser.add_argument("--validate-config", action="store_true")
         args = parser.parse_args()
 
+        if args.validate_config:
+            # the config can be validated without starting the logger process
+            logging.basicConfig(level=logging.INFO)
+            self.ensure_dirs()
+
+            if not self.load_config():
+                sys.exit(1)
+
+            print("*************************************************************")
+            print("*** Your config file is valid.                            ***")
+            print("*************************************************************")
+            sys.exit(0)
+
         self.init_logger()
         logger.info(f"Starting Frigate ({VERSION})")
 
         try:
             self.ensure_dirs()
-            try:
-                self.init_config()
-            except Exception as e:
-                print("*************************************************************")
-                print("*************************************************************")
-                print("***    Your config file is not valid!                     ***")
-                print("***    Please check the docs at                           ***")
-                print("***    https://docs.frigate.video/configuration/index     ***")
-                print("*************************************************************")
-                print("*************************************************************")
-                print("***    Config Validation Errors                           ***")
-                print("*************************************************************")
-                if isinstance(e, ValidationError):
-                    for error in e.errors():
-                        location = ".".join(str(item) for item in error["loc"])
-                        print(f"{location}: {error['msg']}")
-                else:
-                    print(e)
-                    print(traceback.format_exc())
-                print("*************************************************************")
-                print("***    End Config Validation Errors                       ***")
-                print("*************************************************************")
+            if not self.load_config():
                 self.log_process.terminate()
                 sys.exit(1)
-            if args.validate_config:
-                print("*************************************************************")
-                print("*** Your config file is valid.                            ***")
-                print("*************************************************************")
-                self.log_process.terminate()
-                sys.exit(0)
+            self.init_camera_metrics()
             self.set_environment_vars()
             self.set_log_levels()
+            self.preload_modules()
             self.init_queues()
             self.init_database()
             self.init_onvif()
-            self.init_recording_manager()
-            self.init_review_segment_manager()
-            self.init_embeddings_manager()
-            self.init_go2rtc()
+            self.run_stages(
+                [
+                    ("recording", [], self.init_recording_manager),
+                    ("review", [], self.init_review_segment_manager),
+                    ("embeddings", [], self.init_embeddings_manager),
+                    ("go2rtc", [], self.init_go2rtc),
+                ]
+            )
             self.bind_database()
+            self.start_database_vacuum()
             self.check_db_data_migrations()
             self.init_inter_process_communicator()
             self.init_dispatcher()
@@ -727,25 +931,47 @@ class FrigateApp:
             print(e)
             self.log_process.terminate()
             sys.exit(1)
-        self.start_detectors()
-        self.start_video_output_processor()
-        self.start_ptz_autotracker()
-        self.init_historical_regions()
-        self.start_detected_frames_processor()
-        self.start_camera_processors()
-        self.check_shm()
-        self.start_camera_capture_processes()
-        self.start_audio_processors()
-        self.start_storage_maintainer()
-        self.init_external_event_processor()
-        self.start_stats_emitter()
-        self.init_web_server()
-        self.start_timeline_processor()
-        self.start_event_processor()
-        self.start_event_cleanup()
-        self.start_record_cleanup()
-        self.start_watchdog()
-        self.init_auth()
+        self.run_stages(
+            [
+                ("detectors", [], self.start_detectors),
+                ("video_output", [], self.start_video_output_processor),
+                ("ptz_autotracker", [], self.start_ptz_autotracker),
+                ("regions", [], self.init_historical_regions),
+                ("shm", [], self.check_shm),
+                (
+                    "detected_frames",
+                    ["ptz_autotracker"],
+                    self.start_detected_frames_processor,
+                ),
+                (
+                    "camera_processors",
+                    ["detectors", "regions", "detected_frames"],
+                    self.start_camera_processors,
+                ),
+                (
+                    "camera_capture",
+                    ["camera_processors", "shm"],
+                    self.start_camera_capture_processes,
+                ),
+                ("audio", [], self.start_audio_processors),
+                ("storage", [], self.start_storage_maintainer),
+                ("external_events", [], self.init_external_event_processor),
+                # the stats emitter reads self.processes, so every stage that
+                # adds a process to it has to finish first
+                ("stats", ["detectors", "audio"], self.start_stats_emitter),
+                (
+                    "web_server",
+                    ["detected_frames", "storage", "external_events", "stats"],
+                    self.init_web_server,
+                ),
+                ("timeline", [], self.start_timeline_processor),
+                ("events", [], self.start_event_processor),
+                ("event_cleanup", [], self.start_event_cleanup),
+                ("record_cleanup", [], self.start_record_cleanup),
+                ("watchdog", ["detectors"], self.start_watchdog),
+                ("auth", [], self.init_auth),
+            ]
+        )
 
         # Flask only listens for SIGINT, so we need to catch SIGTERM and send SIGINT
         def receiveSignal(signalNumber: int, frame: Optional[FrameType]) -> None:
@@ -767,63 +993,82 @@ class FrigateApp:
 
         self.stop_event.set()
 
-        # set an end_time on entries without an end_time before exiting
-        Event.update(
-            end_time=datetime.datetime.now().timestamp(), has_snapshot=False
-        ).where(Event.end_time == None).execute()
-        ReviewSegment.update(end_time=datetime.datetime.now().timestamp()).where(
-            ReviewSegment.end_time == None
-        ).execute()
-
-        # stop the audio process
-        if self.audio_process is not None:
-            self.audio_process.terminate()
-            self.audio_process.join()
-
-        # ensure the capture processes are done
-        for camera in self.camera_metrics.keys():
-            capture_process = self.camera_metrics[camera]["capture_process"]
-            if capture_process is not None:
-                logger.info(f"Waiting for capture process for {camera} to stop")
-                capture_process.terminate()
-                capture_process.join()
-
-        # ensure the camera processors are done
-        for camera in self.camera_metrics.keys():
-            camera_process = self.camera_metrics[camera]["process"]
-            if camera_process is not None:
-                logger.info(f"Waiting for process for {camera} to stop")
-                camera_process.terminate()
-                camera_process.join()
-                logger.info(f"Closing frame queue for {camera}")
-                frame_queue = self.camera_metrics[camera]["frame_queue"]
-                empty_and_close_queue(frame_queue)
-
-        # ensure the detectors are done
-        for detector in self.detectors.values():
-            detector.stop()
-
-        empty_and_close_queue(self.detection_queue)
+        # set an end_time on entries without an end_time before exiting. both
+        # updates are queued before waiting so the writer thread runs them
+        # back to back, each one is committed on its own
+        end_time = time.time()
+        cursors = [
+            self.db.execute(
+                Event.update(end_time=end_time, has_snapshot=False).where(
+                    Event.end_time == None
+                )
+            ),
+            self.db.execute(
+                ReviewSegment.update(end_time=end_time).where(
+                    ReviewSegment.end_time == None
+                )
+            ),
+        ]
+
+        # wait for the updates to be written, raising any error
+        for cursor in cursors:
+            self.db.rows_affected(cursor)
+
+        # terminate every process first and then wait for all of them, so
+        # the time to stop doesn't grow with the number of cameras
+        cameras = [
+            (
+                camera,
+                metrics["capture_process"],
+                metrics["process"],
+                metrics["frame_queue"],
+            )
+            for camera, metrics in self.camera_metrics.items()
+        ]
+        stopping: list[Optional[mp.Process]] = [self.audio_process]
+
+        for _, capture_process, camera_process, _ in cameras:
+            stopping.append(capture_process)
+            stopping.append(camera_process)
+
+        stopping.extend(
+            [self.output_processor, self.recording_process, self.review_segment_process]
+        )
+        processes: list[mp.Process] = [
+            process for process in stopping if process is not None
+        ]
+
+        for process in processes:
+            process.terminate()
+
+        for process in processes:
+            logger.info(f"Waiting for {process.name} to stop")
+            process.join()
+
+        for camera, _, _, frame_queue in cameras:
+            logger.info(f"Closing frame queue for {camera}")
+            frame_queue.close()
+            frame_queue.unlink()
+
+        # ensure the detectors are done, each one waits for its own process
+        with ThreadPoolExecutor(max_workers=max(1, len(self.detectors))) as executor:
+            list(
+                executor.map(lambda detector: detector.stop(), self.detectors.values())
+            )
+
+        discard_and_close_queue(self.detection_queue)
         logger.info("Detection queue closed")
 
         self.detected_frames_processor.join()
-        empty_and_close_queue(self.detected_frames_queue)
+        self.detected_frames_queue.close()
+        self.detected_frames_queue.unlink()
         logger.info("Detected frames queue closed")
 
         self.timeline_processor.join()
         self.event_processor.join()
-        empty_and_close_queue(self.timeline_queue)
+        discard_and_close_queue(self.timeline_queue)
         logger.info("Timeline queue closed")
 
-        self.output_processor.terminate()
-        self.output_processor.join()
-
-        self.recording_process.terminate()
-        self.recording_process.join()
-
-        self.review_segment_process.terminate()
-        self.review_segment_process.join()
-
         self.external_event_processor.stop()
         self.dispatcher.stop()
         self.ptz_autotracker_thread.join()
@@ -848,7 +1093,22 @@ class FrigateApp:
             shm.close()
             shm.unlink()
 
+        self.shared_metrics.close(unlink=True)
+
+        # flush the handlers of this process, the log process then writes
+        # out what is left in the ring before it exits
+        logging.shutdown()
         self.log_process.terminate()
-        self.log_process.join()
+        self.log_process.join(timeout=5)
+
+        if self.log_process.is_alive():
+            self.log_process.kill()
+            self.log_process.join()
+
+        self.log_queue.close()
+        self.log_queue.unlink()
 
+        # os._exit skips flushing the standard streams
+        sys.stdout.flush()
+        sys.stderr.flush()
         os._exit(os.EX_OK)
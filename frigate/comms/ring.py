@@ -0,0 +1,160 @@
+"""Facilitates passing messages between processes over shared memory."""
+
+import multiprocessing as mp
+import pickle
+import queue
+import struct
+from multiprocessing import shared_memory
+from typing import Any, Optional
+
+# head and tail counters are kept on separate cache lines
+HEADER_SIZE = 128
+HEAD_INDEX = 0
+TAIL_INDEX = 8
+LENGTH_PREFIX = struct.Struct("I")
+FRAME_TIME = struct.Struct("d")
+
+
+class SharedRing:
+    """Bounded multi producer, single consumer ring buffer in shared memory.
+
+    Messages are pickled directly into fixed size slots of a single shared
+    memory block, which avoids the pipe and feeder thread used by mp.Queue.
+    Producers are serialized by a lock when writing, the single consumer
+    never takes the lock.
+    """
+
+    def __init__(self, capacity: int, slot_bytes: int) -> None:
+        self.capacity = max(1, capacity)
+        self.slot_bytes = slot_bytes
+        self.slot_size = LENGTH_PREFIX.size + slot_bytes
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=HEADER_SIZE + self.capacity * self.slot_size
+        )
+        self.free_slots = mp.Semaphore(self.capacity)
+        self.filled_slots = mp.Semaphore(0)
+        self.producer_lock = mp.Lock()
+        self._attach()
+
+    def _attach(self) -> None:
+        self.buf = self.shm.buf
+        self.counters = self.buf[:HEADER_SIZE].cast("Q")
+
+    def __getstate__(self) -> dict[str, Any]:
+        # attach to the same block by name when sent to a spawned process
+        return {
+            "capacity": self.capacity,
+            "slot_bytes": self.slot_bytes,
+            "name": self.shm.name,
+            "free_slots": self.free_slots,
+            "filled_slots": self.filled_slots,
+            "producer_lock": self.producer_lock,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.capacity = state["capacity"]
+        self.slot_bytes = state["slot_bytes"]
+        self.slot_size = LENGTH_PREFIX.size + self.slot_bytes
+        self.shm = shared_memory.SharedMemory(name=state["name"])
+        self.free_slots = state["free_slots"]
+        self.filled_slots = state["filled_slots"]
+        self.producer_lock = state["producer_lock"]
+        self._attach()
+
+    def _slot_offset(self, index: int) -> int:
+        return HEADER_SIZE + (index % self.capacity) * self.slot_size
+
+    def qsize(self) -> int:
+        return self.counters[TAIL_INDEX] - self.counters[HEAD_INDEX]
+
+    def empty(self) -> bool:
+        return self.qsize() <= 0
+
+    def full(self) -> bool:
+        return self.qsize() >= self.capacity
+
+    def put(
+        self, item: Any, block: bool = True, timeout: Optional[float] = None
+    ) -> None:
+        """Add an item to the ring, raises queue.Full if there is no free slot."""
+        payload = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+
+        if len(payload) > self.slot_bytes:
+            raise ValueError(
+                f"Message of {len(payload)} bytes does not fit in a {self.slot_bytes} byte slot"
+            )
+
+        if not self.free_slots.acquire(block, timeout):
+            raise queue.Full
+
+        with self.producer_lock:
+            tail = self.counters[TAIL_INDEX]
+            offset = self._slot_offset(tail)
+            LENGTH_PREFIX.pack_into(self.buf, offset, len(payload))
+            start = offset + LENGTH_PREFIX.size
+            self.buf[start : start + len(payload)] = payload
+            self.counters[TAIL_INDEX] = tail + 1
+
+        self.filled_slots.release()
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """Remove the oldest item from the ring, raises queue.Empty if there is none."""
+        if not self.filled_slots.acquire(block, timeout):
+            raise queue.Empty
+
+        head = self.counters[HEAD_INDEX]
+        offset = self._slot_offset(head)
+        (length,) = LENGTH_PREFIX.unpack_from(self.buf, offset)
+        start = offset + LENGTH_PREFIX.size
+        item = pickle.loads(self.buf[start : start + length])
+        self.counters[HEAD_INDEX] = head + 1
+
+        self.free_slots.release()
+        return item
+
+    def close(self) -> None:
+        """Detach this process from the ring."""
+        # views of the buffer must be released before the memory is closed
+        self.counters.release()
+        self.buf = None
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory, should only be called by the creator."""
+        self.shm.unlink()
+
+
+class SharedFrameRing(SharedRing):
+    """Single producer, single consumer ring buffer of frame times.
+
+    Frame times are written directly into the slots without pickling, and
+    since there is only one producer the producer lock is never taken.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(capacity, FRAME_TIME.size)
+
+    def put(
+        self, item: float, block: bool = True, timeout: Optional[float] = None
+    ) -> None:
+        """Add a frame time to the ring, raises queue.Full if there is no free slot."""
+        if not self.free_slots.acquire(block, timeout):
+            raise queue.Full
+
+        tail = self.counters[TAIL_INDEX]
+        FRAME_TIME.pack_into(self.buf, self._slot_offset(tail), item)
+        self.counters[TAIL_INDEX] = tail + 1
+
+        self.filled_slots.release()
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> float:
+        """Remove the oldest frame time from the ring, raises queue.Empty if there is none."""
+        if not self.filled_slots.acquire(block, timeout):
+            raise queue.Empty
+
+        head = self.counters[HEAD_INDEX]
+        (item,) = FRAME_TIME.unpack_from(self.buf, self._slot_offset(head))
+        self.counters[HEAD_INDEX] = head + 1
+
+        self.free_slots.release()
+        return item
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import logging
 import os
 import shutil
@@ -197,6 +196,19 @@ class TelemetryConfig(FrigateBaseModel):
     version_check: bool = Field(default=True, title="Enable latest version check.")
 
 
+class SchedulingConfig(FrigateBaseModel):
+    pin_cameras: bool = Field(
+        default=False,
+        title="Pin the capture and processor of each camera to the same CPU core.",
+    )
+    realtime_detectors: bool = Field(
+        default=False, title="Run detector processes with the SCHED_FIFO policy."
+    )
+    realtime_priority: int = Field(
+        default=1, ge=1, le=99, title="SCHED_FIFO priority of detector processes."
+    )
+
+
 class MqttConfig(FrigateBaseModel):
     enabled: bool = Field(title="Enable MQTT Communication.", default=True)
     host: str = Field(default="", title="MQTT Host")
@@ -1424,6 +1436,9 @@ class FrigateConfig(FrigateBaseModel):
     telemetry: TelemetryConfig = Field(
         default_factory=TelemetryConfig, title="Telemetry configuration."
     )
+    scheduling: SchedulingConfig = Field(
+        default_factory=SchedulingConfig, title="Process scheduling configuration."
+    )
     model: ModelConfig = Field(
         default_factory=ModelConfig, title="Detection model configuration."
     )
@@ -1766,7 +1781,8 @@ class FrigateConfig(FrigateBaseModel):
         if config_file.endswith(YAML_EXT):
             config = load_config_with_no_duplicates(raw_config)
         elif config_file.endswith(".json"):
-            config = json.loads(raw_config)
+            # validate while decoding instead of building an intermediate dict
+            return cls.model_validate_json(raw_config)
 
         return cls.model_validate(config)
 
@@ -24,6 +24,11 @@ class DetectionApi(ABC):
     def detect_raw(self, tensor_input):
         pass
 
+    def detect_batch(self, tensor_inputs):
+        """Detect a list of frames, detectors that can run a batch in a
+        single inference call should override this."""
+        return [self.detect_raw(tensor_input) for tensor_input in tensor_inputs]
+
     def post_process_yolonas(self, output):
         """
         @param output: output of inference
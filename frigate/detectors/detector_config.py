@@ -140,6 +140,9 @@ class BaseDetectorConfig(BaseModel):
     model: Optional[ModelConfig] = Field(
         default=None, title="Detector specific model configuration."
     )
+    batch_size: int = Field(
+        default=1, ge=1, title="Maximum number of frames to detect in one call."
+    )
     model_config = ConfigDict(
         extra="allow", arbitrary_types_allowed=True, protected_namespaces=()
     )
@@ -1,7 +1,10 @@
+import datetime
+import hashlib
 import logging
+import os
 
-import cv2
 import numpy as np
+from pydantic import Field
 from typing_extensions import Literal
 
 from frigate.detectors.detection_api import DetectionApi
@@ -14,10 +17,17 @@ from frigate.detectors.detector_config import (
 logger = logging.getLogger(__name__)
 
 DETECTOR_KEY = "onnx"
+TRT_INT8_CALIBRATION_TABLE = "/config/model_cache/tensorrt/ort/calibration.flatbuffers"
+TRT_CONTEXT_MODEL_DIR = "/config/model_cache/tensorrt/ort/context"
+CUDA_PROVIDERS = ["TensorrtExecutionProvider", "CUDAExecutionProvider"]
+GPU_PROVIDERS = [*CUDA_PROVIDERS, "ROCMExecutionProvider"]
+COMPILING_PROVIDERS = ["TensorrtExecutionProvider", "OpenVINOExecutionProvider"]
+ONNX_OPTIMIZED_MODEL_DIR = "/config/model_cache/onnx"
 
 
 class ONNXDetectorConfig(BaseDetectorConfig):
     type: Literal[DETECTOR_KEY]
+    num_threads: int = Field(default=3, title="Number of detection threads")
 
 
 class ONNXDetector(DetectionApi):
@@ -39,72 +49,296 @@ class ONNXDetector(DetectionApi):
 
         providers = ort.get_available_providers()
         options = []
+        context_path = None
+
+        # the provider that runs the graph, other providers like azure are
+        # available in the stock wheels but don't run any nodes
+        model_variant = next(
+            (provider for provider in providers if provider in GPU_PROVIDERS),
+            "CPUExecutionProvider",
+        )
+
+        # without an accelerator, prefer a quantized model next to the
+        # configured one which runs on the int8 kernels of the cpu
+        if not any(
+            provider in GPU_PROVIDERS or provider in COMPILING_PROVIDERS
+            for provider in providers
+        ) and path.endswith(".onnx"):
+            quantized_path = f"{path[: -len('.onnx')]}.int8.onnx"
+
+            if os.path.isfile(quantized_path):
+                logger.info(f"ONNX: using quantized model {quantized_path}")
+                path = quantized_path
+                model_variant = f"{model_variant}-int8"
 
         for provider in providers:
             if provider == "TensorrtExecutionProvider":
-                options.append(
-                    {
-                        "trt_timing_cache_enable": True,
-                        "trt_timing_cache_path": "/config/model_cache/tensorrt/ort",
-                        "trt_engine_cache_enable": True,
-                        "trt_engine_cache_path": "/config/model_cache/tensorrt/ort/trt-engines",
+                trt_options = {
+                    "trt_timing_cache_enable": True,
+                    "trt_timing_cache_path": "/config/model_cache/tensorrt/ort",
+                    "trt_engine_cache_enable": True,
+                    "trt_engine_cache_path": "/config/model_cache/tensorrt/ort/trt-engines",
+                    "trt_fp16_enable": True,
+                    "trt_max_workspace_size": 4 << 30,
+                    "trt_builder_optimization_level": 5,
+                }
+
+                # the engine is built for the enabled precisions, which are
+                # part of the context model name
+                precision = "fp16"
+
+                # int8 needs a calibration table generated for the model
+                if os.path.isfile(TRT_INT8_CALIBRATION_TABLE):
+                    with open(TRT_INT8_CALIBRATION_TABLE, "rb") as f:
+                        precision = f"fp16-int8-{hashlib.md5(f.read()).hexdigest()}"
+
+                    trt_options.update(
+                        {
+                            "trt_int8_enable": True,
+                            "trt_int8_calibration_table_name": TRT_INT8_CALIBRATION_TABLE,
+                            "trt_int8_use_native_calibration_table": False,
+                        }
+                    )
+
+                # onnxruntime 1.18+ can save the built engine inside a context
+                # model, loading it skips parsing the model and building the
+                # engine on the following starts
+                if tuple(int(v) for v in ort.__version__.split(".")[:2]) >= (1, 18):
+                    context_path = os.path.join(
+                        TRT_CONTEXT_MODEL_DIR,
+                        f"{detector_config.model.model_hash}-{precision}-{ort.__version__}_ctx.onnx",
+                    )
+                    dump_options = {
+                        "trt_dump_ep_context_model": True,
+                        "trt_ep_context_file_path": context_path,
+                        "trt_ep_context_embed_mode": 1,
                     }
-                )
+
+                    if not os.path.isfile(context_path):
+                        os.makedirs(TRT_CONTEXT_MODEL_DIR, exist_ok=True)
+                        trt_options.update(dump_options)
+
+                options.append(trt_options)
             elif provider == "OpenVINOExecutionProvider":
                 options.append({"cache_dir": "/config/model_cache/openvino/ort"})
             else:
                 options.append({})
 
-        self.model = ort.InferenceSession(
-            path, providers=providers, provider_options=options
-        )
+        # each detector runs in its own process, so the threads of every
+        # session compete for the same cores
+        session_options = ort.SessionOptions()
+        session_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        session_options.inter_op_num_threads = 1
+
+        if any(provider in GPU_PROVIDERS for provider in providers):
+            # the cpu only feeds the gpu
+            session_options.intra_op_num_threads = 1
+        else:
+            session_options.intra_op_num_threads = detector_config.num_threads
+
+        # the graph optimizations are saved on the first start, models with
+        # nodes compiled by tensorrt or openvino can't be saved. only the
+        # extended level is saved, the layout optimizations of the full level
+        # depend on the cpu and are applied again each time the model loads
+        if not any(provider in COMPILING_PROVIDERS for provider in providers):
+            optimized_path = os.path.join(
+                ONNX_OPTIMIZED_MODEL_DIR,
+                f"{detector_config.model.model_hash}-{model_variant}-{ort.__version__}.onnx",
+            )
+
+            if os.path.isfile(optimized_path):
+                path = optimized_path
+            else:
+                os.makedirs(ONNX_OPTIMIZED_MODEL_DIR, exist_ok=True)
+                session_options.graph_optimization_level = (
+                    ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+                )
+                session_options.optimized_model_filepath = optimized_path
+
+        if context_path is not None and os.path.isfile(context_path):
+            try:
+                self.model = ort.InferenceSession(
+                    context_path,
+                    sess_options=session_options,
+                    providers=providers,
+                    provider_options=options,
+                )
+                path = context_path
+            except Exception as e:
+                # the engine was built for another gpu or tensorrt version,
+                # or the dump was interrupted, so it is built again
+                logger.warning(
+                    f"ONNX: unable to load {context_path}, rebuilding the engine: {e}"
+                )
+                os.remove(context_path)
+                trt_options.update(dump_options)
+
+        if path != context_path:
+            self.model = ort.InferenceSession(
+                path,
+                sess_options=session_options,
+                providers=providers,
+                provider_options=options,
+            )
 
         self.h = detector_config.model.height
         self.w = detector_config.model.width
+        # multiplying by the reciprocal is cheaper than dividing every box
+        self.inv_h = np.float32(1.0 / self.h)
+        self.inv_w = np.float32(1.0 / self.w)
+        self.detections = np.zeros((20, 6), np.float32)
         self.onnx_model_type = detector_config.model.model_type
         self.onnx_model_px = detector_config.model.input_pixel_format
-        path = detector_config.model.path
+
+        model_input = self.model.get_inputs()[0]
+        self.model_input_name = model_input.name
+        self.model_input_shape = model_input.shape
+
+        if self.onnx_model_type == ModelTypeEnum.yolonas:
+            # frames are copied into an input buffer that is bound to the
+            # session once, the output shape depends on the number of
+            # predictions so it is only bound to a device
+            self.input_tensor = np.zeros(
+                (1, 3, self.model_input_shape[2], self.model_input_shape[3]),
+                np.uint8,
+            )
+
+            if any(provider in CUDA_PROVIDERS for provider in providers):
+                # the input and output stay on the gpu, only the frame is
+                # uploaded and the predictions downloaded on each run
+                self.device = "cuda"
+                self.input_ortvalue = ort.OrtValue.ortvalue_from_shape_and_type(
+                    self.input_tensor.shape, np.uint8, self.device, 0
+                )
+                self.input_ortvalue.update_inplace(self.input_tensor)
+            else:
+                self.device = "cpu"
+                self.input_ortvalue = ort.OrtValue.ortvalue_from_numpy(
+                    self.input_tensor
+                )
+
+            self.io_binding = self.model.io_binding()
+            self.io_binding.bind_ortvalue_input(
+                self.model_input_name, self.input_ortvalue
+            )
+            self.io_binding.bind_output(self.model.get_outputs()[0].name, self.device)
+
+            # the first runs build the engine and allocate memory for the
+            # smallest and largest batch, which would otherwise delay the
+            # first detections
+            start = datetime.datetime.now().timestamp()
+
+            for _ in range(2):
+                self.model.run_with_iobinding(self.io_binding)
+
+            if (
+                not isinstance(self.model_input_shape[0], int)
+                and detector_config.batch_size > 1
+            ):
+                batch_input = {
+                    self.model_input_name: np.zeros(
+                        (detector_config.batch_size, *self.input_tensor.shape[1:]),
+                        np.uint8,
+                    )
+                }
+
+                for _ in range(2):
+                    self.model.run(None, batch_input)
+
+            logger.info(
+                f"ONNX: warmed up in {datetime.datetime.now().timestamp() - start:.2f} seconds"
+            )
 
         logger.info(f"ONNX: {path} loaded")
 
     def detect_raw(self, tensor_input):
-        model_input_name = self.model.get_inputs()[0].name
-        model_input_shape = self.model.get_inputs()[0].shape
+        if isinstance(tensor_input, list):
+            return self.detect_batch(tensor_input)
 
-        # adjust input shape
         if self.onnx_model_type == ModelTypeEnum.yolonas:
-            tensor_input = cv2.dnn.blobFromImage(
-                tensor_input[0],
-                1.0,
-                (model_input_shape[3], model_input_shape[2]),
-                None,
-                swapRB=self.onnx_model_px == PixelFormatEnum.bgr,
-            ).astype(np.uint8)
+            self.yolonas_input(tensor_input[0], self.input_tensor[0])
+
+            if self.device == "cuda":
+                self.input_ortvalue.update_inplace(self.input_tensor)
+
+            self.model.run_with_iobinding(self.io_binding)
+            # the detections buffer is reused, the caller copies it before
+            # the next frame is detected
+            return self.yolonas_detections(
+                self.io_binding.copy_outputs_to_cpu()[0], self.detections
+            )
+        else:
+            raise Exception(
+                f"{self.onnx_model_type} is currently not supported for rocm. See the docs for more info on supported models."
+            )
 
-        tensor_output = self.model.run(None, {model_input_name: tensor_input})
+    def detect_batch(self, tensor_inputs):
+        # models exported with a fixed batch size run one frame at a time,
+        # copying the reused detections buffer for each frame
+        if isinstance(self.model_input_shape[0], int):
+            return [
+                self.detect_raw(tensor_input).copy() for tensor_input in tensor_inputs
+            ]
+
+        if self.onnx_model_type == ModelTypeEnum.yolonas:
+            tensor_input = np.empty(
+                (len(tensor_inputs), *self.input_tensor.shape[1:]), np.uint8
+            )
+
+            for i, frame in enumerate(tensor_inputs):
+                self.yolonas_input(frame[0], tensor_input[i])
+        else:
+            tensor_input = np.concatenate(tensor_inputs)
+
+        tensor_output = self.model.run(None, {self.model_input_name: tensor_input})
 
         if self.onnx_model_type == ModelTypeEnum.yolonas:
             predictions = tensor_output[0]
 
-            detections = np.zeros((20, 6), np.float32)
-
-            for i, prediction in enumerate(predictions):
-                if i == 20:
-                    break
-                (_, x_min, y_min, x_max, y_max, confidence, class_id) = prediction
-                # when running in GPU mode, empty predictions in the output have class_id of -1
-                if class_id < 0:
-                    break
-                detections[i] = [
-                    class_id,
-                    confidence,
-                    y_min / self.h,
-                    x_min / self.w,
-                    y_max / self.h,
-                    x_max / self.w,
-                ]
-            return detections
+            batch_detections = np.empty((len(tensor_inputs), 20, 6), np.float32)
+
+            # the first column is the index of the frame in the batch
+            return [
+                self.yolonas_detections(
+                    predictions[predictions[:, 0] == i], batch_detections[i]
+                )
+                for i in range(len(tensor_inputs))
+            ]
         else:
             raise Exception(
                 f"{self.onnx_model_type} is currently not supported for rocm. See the docs for more info on supported models."
             )
+
+    def yolonas_input(self, frame, model_input):
+        """Write a HWC uint8 frame into a CHW uint8 model input.
+
+        The frame is only transposed and copied once, scaling it to float
+        and back like cv2.dnn.blobFromImage does is not needed.
+        """
+        if frame.shape[:2] != model_input.shape[1:]:
+            # only needed when the frame size doesn't match the model
+            import cv2
+
+            frame = cv2.resize(frame, (model_input.shape[2], model_input.shape[1]))
+
+        if self.onnx_model_px == PixelFormatEnum.bgr:
+            frame = frame[..., ::-1]
+
+        model_input[:] = frame.transpose(2, 0, 1)
+
+    def yolonas_detections(self, predictions, detections):
+        # when running in GPU mode, empty predictions in the output have class_id of -1
+        # and only follow the real predictions, so the output is cut at the first one
+        empty = predictions[:, 6] < 0
+        count = int(np.argmax(empty)) if empty.any() else len(predictions)
+        count = min(count, 20)
+        predictions = predictions[:count]
+
+        detections[count:] = 0
+        detections[:count, 0] = predictions[:, 6]
+        detections[:count, 1] = predictions[:, 5]
+        detections[:count, 2] = predictions[:, 2] * self.inv_h
+        detections[:count, 3] = predictions[:, 1] * self.inv_w
+        detections[:count, 4] = predictions[:, 4] * self.inv_h
+        detections[:count, 5] = predictions[:, 3] * self.inv_w
+        return detections
@@ -1,6 +1,5 @@
 import logging
 
-import cv2
 import numpy as np
 
 logger = logging.getLogger(__name__)
@@ -26,7 +25,10 @@ def preprocess(tensor_input, model_input_shape, model_input_element_type):
         logger.warn(
             f"preprocess: tensor_input.shape {tensor_input.shape} and model_input_shape {model_input_shape} do not match!"
         )
-    # cv2.dnn.blobFromImage is faster than numpying it
+    # cv2.dnn.blobFromImage is faster than numpying it, the detector registry
+    # imports every plugin so cv2 is only imported once it is needed
+    import cv2
+
     return cv2.dnn.blobFromImage(
         tensor_input[0],
         1.0 / 255,
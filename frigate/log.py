@@ -4,35 +4,69 @@ import multiprocessing as mp
 import os
 import queue
 import signal
+import sys
 import threading
 from collections import deque
-from logging import handlers
-from multiprocessing import Queue
 from types import FrameType
 from typing import Deque, Optional
 
 from setproctitle import setproctitle
 
+from frigate.comms.ring import SharedRing
 from frigate.util.builtin import clean_camera_user_pass
 
+# room for the pickle framing of a message in a ring slot
+RING_MESSAGE_OVERHEAD = 32
+TRUNCATED_PREFIX = b"[truncated] ..."
 
-def listener_configurer() -> None:
-    root = logging.getLogger()
 
-    if root.hasHandlers():
-        root.handlers.clear()
+class RingHandler(logging.Handler):
+    """Formats records and passes them to the log process over a shared ring."""
 
-    console_handler = logging.StreamHandler()
-    formatter = logging.Formatter(
-        "[%(asctime)s] %(name)-30s %(levelname)-8s: %(message)s", "%Y-%m-%d %H:%M:%S"
-    )
-    console_handler.setFormatter(formatter)
-    root.addHandler(console_handler)
-    root.setLevel(logging.INFO)
+    def __init__(self, ring: SharedRing) -> None:
+        super().__init__()
+        self.ring = ring
+        self.max_length = ring.slot_bytes - RING_MESSAGE_OVERHEAD
+        self.dropped = 0
 
+    def truncate(self, message: bytes) -> bytes:
+        """Keep the end of oversized messages, that is where a traceback ends."""
+        if len(message) <= self.max_length:
+            return message
 
-def root_configurer(queue: Queue) -> None:
-    h = handlers.QueueHandler(queue)
+        keep = self.max_length - len(TRUNCATED_PREFIX)
+        return TRUNCATED_PREFIX + message[-keep:]
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if str(record.msg).startswith("You are using a scalar distance function"):
+            return
+
+        try:
+            message = self.truncate(self.format(record).encode("utf-8"))
+
+            # never block the caller, drop the message if the log process is not keeping up
+            if self.dropped:
+                self.ring.put(
+                    f"{self.dropped} log messages were dropped".encode("utf-8"),
+                    block=False,
+                )
+                self.dropped = 0
+
+            self.ring.put(message, block=False)
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+
+def root_configurer(ring: SharedRing) -> None:
+    h = RingHandler(ring)
+    h.setFormatter(
+        logging.Formatter(
+            "[%(asctime)s] %(name)-30s %(levelname)-8s: %(message)s",
+            "%Y-%m-%d %H:%M:%S",
+        )
+    )
     root = logging.getLogger()
 
     if root.hasHandlers():
@@ -42,10 +76,9 @@ def root_configurer(queue: Queue) -> None:
     root.setLevel(logging.INFO)
 
 
-def log_process(log_queue: Queue) -> None:
+def log_process(ring: SharedRing) -> None:
     threading.current_thread().name = "logger"
     setproctitle("frigate.logger")
-    listener_configurer()
 
     stop_event = mp.Event()
 
@@ -57,15 +90,14 @@ def log_process(log_queue: Queue) -> None:
 
     while True:
         try:
-            record = log_queue.get(block=True, timeout=1.0)
+            # once stopping, exit as soon as the ring is drained
+            message = ring.get(block=not stop_event.is_set(), timeout=1.0)
         except queue.Empty:
             if stop_event.is_set():
                 break
             continue
-        if record.msg.startswith("You are using a scalar distance function"):
-            continue
-        logger = logging.getLogger(record.name)
-        logger.handle(record)
+        sys.stderr.write(f"{message.decode('utf-8', errors='replace')}\n")
+        sys.stderr.flush()
 
 
 # based on https://codereview.stackexchange.com/a/17959
@@ -5,6 +5,7 @@ import os
 import queue
 import signal
 import threading
+import time
 from abc import ABC, abstractmethod
 
 import numpy as np
@@ -14,10 +15,13 @@ from frigate.detectors import create_detector
 from frigate.detectors.detector_config import InputTensorEnum
 from frigate.util.builtin import EventsPerSecond, load_labels
 from frigate.util.image import SharedMemoryFrameManager
-from frigate.util.services import listen
+from frigate.util.services import listen, set_realtime_priority
 
 logger = logging.getLogger(__name__)
 
+# how long to wait for more frames to fill a batch
+DETECTION_BATCH_WAIT = 0.001
+
 
 class ObjectDetector(ABC):
     @abstractmethod
@@ -74,6 +78,34 @@ class LocalObjectDetector(ObjectDetector):
             tensor_input = np.transpose(tensor_input, self.input_transform)
         return self.detect_api.detect_raw(tensor_input=tensor_input)
 
+    def detect_raw_batch(self, tensor_inputs):
+        if self.input_transform:
+            tensor_inputs = [
+                np.transpose(tensor_input, self.input_transform)
+                for tensor_input in tensor_inputs
+            ]
+        return self.detect_api.detect_batch(tensor_inputs)
+
+
+def get_detection_batch(detection_queue: mp.Queue, batch_size: int) -> list[str]:
+    """Wait for a frame to detect, raises queue.Empty if none arrives.
+
+    Frames that are waiting or arrive shortly after are detected in the same
+    call, up to the batch size of the detector.
+    """
+    connection_ids = [detection_queue.get(timeout=1)]
+    batch_deadline = time.monotonic() + DETECTION_BATCH_WAIT
+
+    while len(connection_ids) < batch_size:
+        try:
+            connection_ids.append(
+                detection_queue.get(timeout=max(0.0, batch_deadline - time.monotonic()))
+            )
+        except queue.Empty:
+            break
+
+    return connection_ids
+
 
 def run_detector(
     name: str,
@@ -107,30 +139,48 @@ def run_detector(
         out_np = np.ndarray((20, 6), dtype=np.float32, buffer=out_shm.buf)
         outputs[name] = {"shm": out_shm, "np": out_np}
 
+    batch_size = detector_config.batch_size
+
     while not stop_event.is_set():
         try:
-            connection_id = detection_queue.get(timeout=1)
+            connection_ids = get_detection_batch(detection_queue, batch_size)
         except queue.Empty:
             continue
-        input_frame = frame_manager.get(
-            connection_id,
-            (1, detector_config.model.height, detector_config.model.width, 3),
-        )
 
-        if input_frame is None:
-            logger.warning(f"Failed to get frame {connection_id} from SHM")
+        batch_ids = []
+        input_frames = []
+
+        for connection_id in connection_ids:
+            input_frame = frame_manager.get(
+                connection_id,
+                (1, detector_config.model.height, detector_config.model.width, 3),
+            )
+
+            if input_frame is None:
+                logger.warning(f"Failed to get frame {connection_id} from SHM")
+                continue
+
+            batch_ids.append(connection_id)
+            input_frames.append(input_frame)
+
+        if not input_frames:
             continue
 
         # detect and send the output
         start.value = datetime.datetime.now().timestamp()
-        detections = object_detector.detect_raw(input_frame)
+        if len(input_frames) == 1:
+            batch_detections = [object_detector.detect_raw(input_frames[0])]
+        else:
+            batch_detections = object_detector.detect_raw_batch(input_frames)
         duration = datetime.datetime.now().timestamp() - start.value
-        frame_manager.close(connection_id)
-        outputs[connection_id]["np"][:] = detections[:]
-        out_events[connection_id].set()
+
+        for connection_id, detections in zip(batch_ids, batch_detections):
+            frame_manager.close(connection_id)
+            outputs[connection_id]["np"][:] = detections[:]
+            out_events[connection_id].set()
         start.value = 0.0
 
-        avg_speed.value = (avg_speed.value * 9 + duration) / 10
+        avg_speed.value = (avg_speed.value * 9 + duration / len(batch_ids)) / 10
 
     logger.info("Exited detection process...")
 
@@ -142,6 +192,7 @@ class ObjectDetectProcess:
         detection_queue,
         out_events,
         detector_config,
+        realtime_priority=None,
     ):
         self.name = name
         self.out_events = out_events
@@ -150,6 +201,7 @@ class ObjectDetectProcess:
         self.detection_start = mp.Value("d", 0.0)
         self.detect_process = None
         self.detector_config = detector_config
+        self.realtime_priority = realtime_priority
         self.start_or_restart()
 
     def stop(self):
@@ -184,6 +236,10 @@ class ObjectDetectProcess:
         self.detect_process.daemon = True
         self.detect_process.start()
 
+        # reapplied on every restart since the priority belongs to the pid
+        if self.realtime_priority and self.detect_process.pid is not None:
+            set_realtime_priority(self.detect_process.pid, self.realtime_priority)
+
 
 class RemoteObjectDetector:
     def __init__(self, name, labels, detection_queue, event, model_config, stop_event):
@@ -6,7 +6,6 @@ import re
 from pathlib import Path
 from typing import Any, List
 
-import cv2
 import requests
 from numpy import ndarray
 from requests.models import Response
@@ -17,6 +16,10 @@ logger = logging.getLogger(__name__)
 
 
 def get_jpg_bytes(image: ndarray, max_dim: int, quality: int) -> bytes:
+    # the detector config imports this module, so cv2 is only imported
+    # when an image is uploaded
+    import cv2
+
     if image.shape[1] >= image.shape[0]:
         width = min(max_dim, image.shape[1])
         height = int(width * image.shape[0] / image.shape[1])
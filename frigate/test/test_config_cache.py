@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import unittest
+
+from frigate.config import FrigateConfig
+from frigate.util.config import (
+    get_config_cache_path,
+    load_cached_config,
+    save_cached_config,
+)
+
+
+class TestConfigCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.dir.name, "config.json")
+        self.labelmap_file = os.path.join(self.dir.name, "labelmap.txt")
+
+        with open(self.labelmap_file, "w") as f:
+            f.write("person\n")
+
+        self.config = {
+            "mqtt": {"host": "mqtt"},
+            "model": {"labelmap_path": self.labelmap_file},
+            "cameras": {
+                "back": {
+                    "ffmpeg": {
+                        "inputs": [
+                            {"path": "rtsp://10.0.0.1:554/video", "roles": ["detect"]}
+                        ]
+                    },
+                    "detect": {
+                        "height": 1080,
+                        "width": 1920,
+                        "fps": 5,
+                    },
+                }
+            },
+        }
+        self.write_config(self.config)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write_config(self, config):
+        with open(self.config_file, "w") as f:
+            json.dump(config, f)
+
+    def parse_and_save(self):
+        config = FrigateConfig.parse_file(self.config_file)
+        save_cached_config(self.config_file, config)
+        return config
+
+    def test_missing_cache_is_a_miss(self):
+        assert load_cached_config(self.config_file) is None
+
+    def test_unchanged_config_is_a_hit(self):
+        config = self.parse_and_save()
+        cached = load_cached_config(self.config_file)
+
+        assert cached is not None
+        assert cached == config
+        assert cached.model.merged_labelmap[0] == "person"
+
+    def test_changed_config_is_stale(self):
+        self.parse_and_save()
+        self.config["cameras"]["back"]["detect"]["fps"] = 10
+        self.write_config(self.config)
+
+        assert load_cached_config(self.config_file) is None
+
+    def test_changed_labelmap_is_stale(self):
+        self.parse_and_save()
+
+        with open(self.labelmap_file, "w") as f:
+            f.write("dog\nperson\n")
+
+        assert load_cached_config(self.config_file) is None
+        assert FrigateConfig.parse_file(self.config_file).model.merged_labelmap[0] == (
+            "dog"
+        )
+
+    def test_changed_detector_labelmap_is_stale(self):
+        detector_labelmap_file = os.path.join(self.dir.name, "detector_labelmap.txt")
+
+        with open(detector_labelmap_file, "w") as f:
+            f.write("person\n")
+
+        self.config["detectors"] = {
+            "cpu": {
+                "type": "cpu",
+                "model": {"labelmap_path": detector_labelmap_file},
+            }
+        }
+        self.write_config(self.config)
+        self.parse_and_save()
+
+        assert load_cached_config(self.config_file) is not None
+
+        with open(detector_labelmap_file, "w") as f:
+            f.write("dog\nperson\n")
+
+        assert load_cached_config(self.config_file) is None
+
+    def test_corrupt_cache_is_a_miss(self):
+        self.parse_and_save()
+
+        with open(get_config_cache_path(self.config_file), "wb") as f:
+            f.write(b"not a pickle")
+
+        assert load_cached_config(self.config_file) is None
+
+    def test_truncated_cache_is_a_miss(self):
+        self.parse_and_save()
+        cache_path = get_config_cache_path(self.config_file)
+
+        with open(cache_path, "rb") as f:
+            data = f.read()
+
+        with open(cache_path, "wb") as f:
+            f.write(data[: len(data) // 2])
+
+        assert load_cached_config(self.config_file) is None
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
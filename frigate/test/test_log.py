@@ -0,0 +1,53 @@
+import logging
+import queue
+import unittest
+
+from frigate.comms.ring import SharedRing
+from frigate.log import TRUNCATED_PREFIX, RingHandler
+
+
+class TestRingHandler(unittest.TestCase):
+    def setUp(self):
+        self.ring = SharedRing(capacity=2, slot_bytes=256)
+        self.handler = RingHandler(self.ring)
+        self.logger = logging.getLogger("test_ring_handler")
+        self.logger.propagate = False
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.ring.close()
+        self.ring.unlink()
+
+    def test_short_message_is_unchanged(self):
+        self.logger.error("camera went offline")
+
+        assert self.ring.get(block=False) == b"camera went offline"
+
+    def test_oversized_message_keeps_the_end(self):
+        message = "x" * 1000 + "ValueError: the last line"
+        self.logger.error(message)
+        logged = self.ring.get(block=False)
+
+        assert len(logged) == self.handler.max_length
+        assert logged.startswith(TRUNCATED_PREFIX)
+        assert logged.endswith(b"ValueError: the last line")
+
+    def test_full_ring_drops_without_blocking(self):
+        for i in range(4):
+            self.logger.error(f"message {i}")
+
+        assert self.handler.dropped == 2
+        assert self.ring.get(block=False) == b"message 0"
+        assert self.ring.get(block=False) == b"message 1"
+        self.assertRaises(queue.Empty, self.ring.get, False)
+
+        self.logger.error("message 4")
+
+        assert self.handler.dropped == 0
+        assert self.ring.get(block=False) == b"2 log messages were dropped"
+        assert self.ring.get(block=False) == b"message 4"
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
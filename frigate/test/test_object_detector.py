@@ -1,3 +1,5 @@
+import queue
+import threading
 import unittest
 from unittest.mock import Mock, patch
 
@@ -87,6 +89,36 @@ class TestLocalObjectDetector(unittest.TestCase):
 
         assert test_result is mock_det_api.detect_raw.return_value
 
+    @patch.dict(
+        "frigate.detectors.api_types",
+        {det_type: Mock() for det_type in DetectorTypeEnum},
+    )
+    def test_detect_raw_batch_should_call_api_detect_batch_with_transposed_tensors(
+        self,
+    ):
+        mock_cputfl = detectors.api_types[DetectorTypeEnum.cpu]
+
+        TEST_DATA = [np.zeros((1, 32, 32, 3), np.uint8) for _ in range(3)]
+
+        test_cfg = parse_obj_as(DetectorConfig, {"type": "cpu", "model": {}})
+        test_cfg.model.input_tensor = InputTensorEnum.nchw
+
+        test_obj_detect = frigate.object_detection.LocalObjectDetector(
+            detector_config=test_cfg
+        )
+
+        mock_det_api = mock_cputfl.return_value
+
+        test_result = test_obj_detect.detect_raw_batch(TEST_DATA)
+
+        mock_det_api.detect_batch.assert_called_once()
+        tensor_inputs = mock_det_api.detect_batch.call_args.args[0]
+        assert len(tensor_inputs) == 3
+        for tensor_input in tensor_inputs:
+            assert tensor_input.shape == (1, 3, 32, 32)
+
+        assert test_result is mock_det_api.detect_batch.return_value
+
     @patch.dict(
         "frigate.detectors.api_types",
         {det_type: Mock() for det_type in DetectorTypeEnum},
@@ -136,3 +168,45 @@ class TestLocalObjectDetector(unittest.TestCase):
             == np.zeros((1, 32, 32, 3)).shape
         )
         assert test_result == TEST_DETECT_RESULT
+
+
+class TestDetectionBatch(unittest.TestCase):
+    def setUp(self):
+        self.detection_queue = queue.Queue()
+
+    def test_waiting_frames_are_batched_up_to_the_batch_size(self):
+        for camera in ["front", "back", "side"]:
+            self.detection_queue.put(camera)
+
+        assert frigate.object_detection.get_detection_batch(
+            self.detection_queue, 2
+        ) == ["front", "back"]
+        assert frigate.object_detection.get_detection_batch(
+            self.detection_queue, 2
+        ) == ["side"]
+
+    def test_batch_size_of_one_takes_a_single_frame(self):
+        self.detection_queue.put("front")
+        self.detection_queue.put("back")
+
+        assert frigate.object_detection.get_detection_batch(
+            self.detection_queue, 1
+        ) == ["front"]
+        assert self.detection_queue.qsize() == 1
+
+    @patch("frigate.object_detection.DETECTION_BATCH_WAIT", 5.0)
+    def test_frames_arriving_before_the_deadline_are_batched(self):
+        self.detection_queue.put("front")
+        threading.Timer(0.05, self.detection_queue.put, ["back"]).start()
+
+        assert frigate.object_detection.get_detection_batch(
+            self.detection_queue, 2
+        ) == ["front", "back"]
+
+    def test_empty_queue_raises(self):
+        self.assertRaises(
+            queue.Empty,
+            frigate.object_detection.get_detection_batch,
+            self.detection_queue,
+            4,
+        )
@@ -0,0 +1,146 @@
+import unittest
+from unittest.mock import Mock
+
+import numpy as np
+
+from frigate.detectors.detector_config import ModelTypeEnum, PixelFormatEnum
+from frigate.detectors.plugins.onnx import ONNXDetector
+
+HEIGHT = 320
+WIDTH = 480
+
+
+def loop_detections(predictions, h, w):
+    """The original per prediction loop the vectorized version replaced."""
+    detections = np.zeros((20, 6), np.float32)
+
+    for i, prediction in enumerate(predictions):
+        if i == 20:
+            break
+        (_, x_min, y_min, x_max, y_max, confidence, class_id) = prediction
+        if class_id < 0:
+            break
+        detections[i] = [
+            class_id,
+            confidence,
+            y_min / h,
+            x_min / w,
+            y_max / h,
+            x_max / w,
+        ]
+    return detections
+
+
+def mock_predictions(count, batch_index=0, seed=0):
+    """Predictions in the flat yolonas nms format:
+    batch index, x_min, y_min, x_max, y_max, confidence, class_id."""
+    rng = np.random.default_rng(seed)
+    predictions = np.empty((count, 7), np.float32)
+    predictions[:, 0] = batch_index
+    predictions[:, 1] = rng.uniform(0, WIDTH / 2, count)
+    predictions[:, 2] = rng.uniform(0, HEIGHT / 2, count)
+    predictions[:, 3] = predictions[:, 1] + rng.uniform(1, WIDTH / 2, count)
+    predictions[:, 4] = predictions[:, 2] + rng.uniform(1, HEIGHT / 2, count)
+    predictions[:, 5] = rng.uniform(0.1, 1.0, count)
+    predictions[:, 6] = rng.integers(0, 80, count)
+    return predictions
+
+
+class TestYoloNasDetections(unittest.TestCase):
+    def setUp(self):
+        # skip loading a model, only the post processing is tested
+        self.detector = ONNXDetector.__new__(ONNXDetector)
+        self.detector.h = HEIGHT
+        self.detector.w = WIDTH
+        self.detector.inv_h = np.float32(1.0 / HEIGHT)
+        self.detector.inv_w = np.float32(1.0 / WIDTH)
+        self.detector.detections = np.zeros((20, 6), np.float32)
+        self.detector.onnx_model_type = ModelTypeEnum.yolonas
+        self.detector.onnx_model_px = PixelFormatEnum.rgb
+        self.detector.input_tensor = np.zeros((1, 3, 8, 8), np.uint8)
+        self.detector.model_input_name = "input"
+        self.detector.model_input_shape = ["batch", 3, 8, 8]
+        self.detector.model = Mock()
+
+    def assert_matches_loop(self, detections, predictions):
+        np.testing.assert_allclose(
+            detections, loop_detections(predictions, HEIGHT, WIDTH), rtol=1e-6
+        )
+
+    def test_column_mapping(self):
+        predictions = mock_predictions(5)
+        detections = self.detector.yolonas_detections(
+            predictions, self.detector.detections
+        )
+
+        self.assert_matches_loop(detections, predictions)
+        assert detections[0, 0] == predictions[0, 6]
+        assert detections[0, 1] == predictions[0, 5]
+
+    def test_cut_at_first_empty_prediction(self):
+        predictions = mock_predictions(6)
+        # gpu output is padded with class_id -1, anything after is ignored
+        predictions[3, 6] = -1
+        detections = self.detector.yolonas_detections(
+            predictions, self.detector.detections
+        )
+
+        self.assert_matches_loop(detections, predictions)
+        assert not detections[3:].any()
+
+    def test_no_predictions(self):
+        predictions = np.empty((0, 7), np.float32)
+        detections = self.detector.yolonas_detections(
+            predictions, self.detector.detections
+        )
+
+        assert not detections.any()
+
+    def test_more_than_20_predictions_are_cut(self):
+        predictions = mock_predictions(30)
+        detections = self.detector.yolonas_detections(
+            predictions, self.detector.detections
+        )
+
+        self.assert_matches_loop(detections, predictions)
+
+    def test_rows_of_a_previous_larger_frame_are_zeroed(self):
+        self.detector.yolonas_detections(
+            mock_predictions(12, seed=1), self.detector.detections
+        )
+        predictions = mock_predictions(3, seed=2)
+        detections = self.detector.yolonas_detections(
+            predictions, self.detector.detections
+        )
+
+        self.assert_matches_loop(detections, predictions)
+
+    def test_detect_batch_splits_predictions_by_frame(self):
+        frames = [np.zeros((1, 8, 8, 3), np.uint8) for _ in range(3)]
+        # the second frame has no predictions
+        predictions = np.concatenate(
+            [
+                mock_predictions(4, batch_index=0, seed=3),
+                mock_predictions(2, batch_index=2, seed=4),
+                mock_predictions(25, batch_index=0, seed=5),
+            ]
+        )
+        self.detector.model.run.return_value = [predictions]
+
+        batch_detections = self.detector.detect_batch(frames)
+
+        self.detector.model.run.assert_called_once()
+        assert self.detector.model.run.call_args.args[1]["input"].shape == (
+            3,
+            3,
+            8,
+            8,
+        )
+        assert len(batch_detections) == 3
+
+        for i, detections in enumerate(batch_detections):
+            self.assert_matches_loop(detections, predictions[predictions[:, 0] == i])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,122 @@
+import datetime
+import logging
+import os
+import unittest
+
+from peewee_migrate import Router
+from playhouse.sqlite_ext import SqliteExtDatabase
+from playhouse.sqliteq import SqliteQueueDatabase
+
+from frigate.config import DetectConfig
+from frigate.models import Event, Regions, Timeline
+from frigate.test.const import TEST_DB, TEST_DB_CLEANUPS
+from frigate.util.image import calculate_region
+from frigate.util.object import GRID_SIZE, get_camera_regions_grid
+
+BOXES = [
+    # near the top left corner
+    [0.0, 0.0, 0.05, 0.08],
+    # near the bottom right corner
+    [0.9, 0.85, 0.095, 0.14],
+    # large object along the left edge
+    [0.0, 0.2, 0.4, 0.75],
+    # small object along the bottom edge
+    [0.5, 0.97, 0.01, 0.025],
+    # object in the middle
+    [0.4, 0.4, 0.2, 0.2],
+]
+
+
+class TestRegionGrid(unittest.TestCase):
+    def setUp(self):
+        migrate_db = SqliteExtDatabase(TEST_DB)
+        del logging.getLogger("peewee_migrate").handlers[:]
+        router = Router(migrate_db)
+        router.run()
+        migrate_db.close()
+        self.db = SqliteQueueDatabase(TEST_DB)
+        self.db.bind([Event, Regions, Timeline])
+
+        self.detect = DetectConfig(width=1280, height=720)
+        self.min_region_size = 320
+
+        now = datetime.datetime.now().timestamp()
+        Event.insert(
+            id="event",
+            label="person",
+            camera="front_door",
+            start_time=now,
+            end_time=now + 20,
+            top_score=100,
+            false_positive=False,
+            zones=list(),
+            thumbnail="",
+            region=[],
+            box=[],
+            area=0,
+            has_clip=True,
+            has_snapshot=True,
+        ).execute()
+
+        for box in BOXES:
+            _insert_mock_timeline("tracked_object", box, now)
+
+        # only tracked objects are used for the grid
+        _insert_mock_timeline("audio", [0.45, 0.45, 0.9, 0.9], now)
+
+    def tearDown(self):
+        if not self.db.is_closed():
+            self.db.close()
+
+        try:
+            for file in TEST_DB_CLEANUPS:
+                os.remove(file)
+        except OSError:
+            pass
+
+    def test_region_sizes_match_calculate_region(self):
+        width = self.detect.width
+        height = self.detect.height
+        expected = [[[] for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
+
+        for box in BOXES:
+            region = calculate_region(
+                (height, width),
+                box[0] * width,
+                box[1] * height,
+                (box[0] + box[2]) * width,
+                (box[1] + box[3]) * height,
+                self.min_region_size,
+                1.35,
+            )
+            x = int((box[0] + box[2] / 2) * GRID_SIZE)
+            y = int((box[1] + box[3] / 2) * GRID_SIZE)
+            expected[x][y].append((region[2] - region[0]) / width)
+
+        grid = get_camera_regions_grid("front_door", self.detect, self.min_region_size)
+
+        for x in range(GRID_SIZE):
+            for y in range(GRID_SIZE):
+                assert grid[x][y]["sizes"] == expected[x][y], (x, y)
+
+    def test_grid_is_saved(self):
+        grid = get_camera_regions_grid("front_door", self.detect, self.min_region_size)
+        saved = Regions.get(Regions.camera == "front_door")
+
+        assert saved.grid == grid
+
+
+def _insert_mock_timeline(source: str, box: list[float], timestamp: float) -> None:
+    """Inserts a timeline entry for the mock event with a given box."""
+    Timeline.insert(
+        timestamp=timestamp,
+        camera="front_door",
+        source=source,
+        source_id="event",
+        class_type="visible",
+        data={"box": box, "label": "person", "region": [0, 0, 1, 1]},
+    ).execute()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
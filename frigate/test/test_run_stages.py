@@ -0,0 +1,86 @@
+import threading
+import unittest
+
+from frigate.app import FrigateApp
+
+
+class TestRunStages(unittest.TestCase):
+    def setUp(self):
+        self.app = FrigateApp()
+        self.lock = threading.Lock()
+        self.events: list[str] = []
+
+    def stage(self, name: str):
+        def run():
+            with self.lock:
+                self.events.append(f"{name}:start")
+
+            with self.lock:
+                self.events.append(f"{name}:end")
+
+        return run
+
+    def test_dependencies_finish_before_dependents_start(self):
+        self.app.run_stages(
+            [
+                ("c", ["b"], self.stage("c")),
+                ("a", [], self.stage("a")),
+                ("b", ["a"], self.stage("b")),
+                ("d", ["a", "c"], self.stage("d")),
+            ]
+        )
+
+        for before, after in [("a", "b"), ("b", "c"), ("a", "d"), ("c", "d")]:
+            assert self.events.index(f"{before}:end") < self.events.index(
+                f"{after}:start"
+            ), (before, after)
+
+        assert len(self.events) == 8
+
+    def test_independent_stages_run_concurrently(self):
+        # both stages must be running at the same time to pass the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        self.app.run_stages(
+            [
+                ("a", [], barrier.wait),
+                ("b", [], barrier.wait),
+            ]
+        )
+
+    def test_cycle_raises(self):
+        with self.assertRaises(ValueError):
+            self.app.run_stages(
+                [
+                    ("a", [], self.stage("a")),
+                    ("b", ["c"], self.stage("b")),
+                    ("c", ["b"], self.stage("c")),
+                ]
+            )
+
+        # stages before the cycle still ran
+        assert self.events == ["a:start", "a:end"]
+
+    def test_unknown_dependency_raises(self):
+        with self.assertRaises(ValueError):
+            self.app.run_stages([("a", ["missing"], self.stage("a"))])
+
+        assert self.events == []
+
+    def test_stage_exception_is_raised(self):
+        def fail():
+            raise RuntimeError("stage failed")
+
+        with self.assertRaises(RuntimeError):
+            self.app.run_stages(
+                [
+                    ("a", [], fail),
+                    ("b", ["a"], self.stage("b")),
+                ]
+            )
+
+        assert self.events == []
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
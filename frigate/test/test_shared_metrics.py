@@ -0,0 +1,38 @@
+import pickle
+from unittest import TestCase, main
+
+from frigate.util.metrics import SharedMetrics
+
+
+class TestSharedMetrics(TestCase):
+    def setUp(self):
+        self.metrics = SharedMetrics(2)
+
+    def tearDown(self):
+        self.metrics.close(unlink=True)
+
+    def test_defaults_to_zero(self):
+        assert self.metrics.value(0, "camera_fps").value == 0.0
+        assert self.metrics.value(1, "ffmpeg_pid").value == 0
+
+    def test_rows_are_independent(self):
+        self.metrics.value(0, "camera_fps").value = 5.0
+        self.metrics.value(1, "camera_fps").value = 10.0
+        assert self.metrics.value(0, "camera_fps").value == 5.0
+        assert self.metrics.value(1, "camera_fps").value == 10.0
+
+    def test_int_field(self):
+        self.metrics.value(1, "ffmpeg_pid").value = 1234
+        assert self.metrics.value(1, "ffmpeg_pid").value == 1234
+        assert isinstance(self.metrics.value(1, "ffmpeg_pid").value, int)
+
+    def test_pickle_attaches_to_same_memory(self):
+        metric = self.metrics.value(1, "process_fps")
+        attached = pickle.loads(pickle.dumps(metric))
+        attached.value = 25.0
+        assert metric.value == 25.0
+        attached.metrics.close()
+
+
+if __name__ == "__main__":
+    main(verbosity=2)
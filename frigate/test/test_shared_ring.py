@@ -0,0 +1,79 @@
+import multiprocessing as mp
+import queue
+from unittest import TestCase, main
+
+from frigate.comms.ring import SharedFrameRing, SharedRing
+
+
+def produce(ring: SharedRing, producer: int, count: int) -> None:
+    for i in range(count):
+        ring.put((producer, i))
+
+
+class TestSharedRing(TestCase):
+    def setUp(self):
+        self.ring = SharedRing(capacity=4, slot_bytes=1024)
+
+    def tearDown(self):
+        self.ring.close()
+        self.ring.unlink()
+
+    def test_fifo_order(self):
+        for i in range(4):
+            self.ring.put(("camera", i, [(1, 0.5)]))
+
+        assert [self.ring.get()[1] for _ in range(4)] == [0, 1, 2, 3]
+
+    def test_full_and_empty(self):
+        assert self.ring.empty()
+
+        for i in range(4):
+            self.ring.put(i)
+
+        assert self.ring.full()
+        self.assertRaises(queue.Full, self.ring.put, 4, False)
+
+        for i in range(4):
+            self.ring.get()
+
+        self.assertRaises(queue.Empty, self.ring.get, True, 0.01)
+
+    def test_message_too_large(self):
+        self.assertRaises(ValueError, self.ring.put, b"0" * 2048)
+
+    def test_multiple_producers(self):
+        producers = [
+            mp.Process(target=produce, args=(self.ring, p, 25)) for p in range(3)
+        ]
+
+        for p in producers:
+            p.start()
+
+        items = [self.ring.get(timeout=5) for _ in range(75)]
+
+        for p in producers:
+            p.join()
+
+        for p in range(3):
+            assert [i for (producer, i) in items if producer == p] == list(range(25))
+
+
+class TestSharedFrameRing(TestCase):
+    def setUp(self):
+        self.ring = SharedFrameRing(capacity=2)
+
+    def tearDown(self):
+        self.ring.close()
+        self.ring.unlink()
+
+    def test_frame_times(self):
+        self.ring.put(1718000000.123456, False)
+        self.ring.put(1718000000.223456, False)
+        self.assertRaises(queue.Full, self.ring.put, 1718000000.323456, False)
+        assert self.ring.get(False) == 1718000000.123456
+        assert self.ring.get(False) == 1718000000.223456
+        assert self.ring.empty()
+
+
+if __name__ == "__main__":
+    main(verbosity=2)
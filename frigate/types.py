@@ -1,38 +1,38 @@
-from multiprocessing import Queue
 from multiprocessing.context import Process
-from multiprocessing.sharedctypes import Synchronized
 from multiprocessing.synchronize import Event
 from typing import Optional, TypedDict
 
+from frigate.comms.ring import SharedFrameRing
 from frigate.object_detection import ObjectDetectProcess
+from frigate.util.metrics import SharedMetric
 
 
 class CameraMetricsTypes(TypedDict):
-    camera_fps: Synchronized
+    camera_fps: SharedMetric
     capture_process: Optional[Process]
-    detection_fps: Synchronized
-    detection_frame: Synchronized
-    ffmpeg_pid: Synchronized
-    frame_queue: Queue
+    detection_fps: SharedMetric
+    detection_frame: SharedMetric
+    ffmpeg_pid: SharedMetric
+    frame_queue: SharedFrameRing
     process: Optional[Process]
-    process_fps: Synchronized
-    read_start: Synchronized
-    skipped_fps: Synchronized
-    audio_rms: Synchronized
-    audio_dBFS: Synchronized
+    process_fps: SharedMetric
+    read_start: SharedMetric
+    skipped_fps: SharedMetric
+    audio_rms: SharedMetric
+    audio_dBFS: SharedMetric
 
 
 class PTZMetricsTypes(TypedDict):
-    ptz_autotracker_enabled: Synchronized
+    ptz_autotracker_enabled: SharedMetric
     ptz_tracking_active: Event
     ptz_motor_stopped: Event
     ptz_reset: Event
-    ptz_start_time: Synchronized
-    ptz_stop_time: Synchronized
-    ptz_frame_time: Synchronized
-    ptz_zoom_level: Synchronized
-    ptz_max_zoom: Synchronized
-    ptz_min_zoom: Synchronized
+    ptz_start_time: SharedMetric
+    ptz_stop_time: SharedMetric
+    ptz_frame_time: SharedMetric
+    ptz_zoom_level: SharedMetric
+    ptz_max_zoom: SharedMetric
+    ptz_min_zoom: SharedMetric
 
 
 class StatsTrackingTypes(TypedDict):
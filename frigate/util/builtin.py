@@ -5,7 +5,6 @@ import copy
 import datetime
 import logging
 import multiprocessing as mp
-import queue
 import re
 import shlex
 import urllib.parse
@@ -94,7 +93,8 @@ def load_config_with_no_duplicates(raw_config) -> dict:
 
     # https://stackoverflow.com/a/71751051
     # important to use SafeLoader here to avoid RCE
-    class PreserveDuplicatesLoader(yaml.loader.SafeLoader):
+    # prefer the libyaml backed loader when it is available since it is much faster
+    class PreserveDuplicatesLoader(getattr(yaml, "CSafeLoader", yaml.SafeLoader)):
         pass
 
     def map_constructor(loader, node, deep=False):
@@ -348,14 +348,15 @@ def clear_and_unlink(file: Path, missing_ok: bool = True) -> None:
     file.unlink(missing_ok=missing_ok)
 
 
-def empty_and_close_queue(q: mp.Queue):
-    while True:
-        try:
-            q.get(block=True, timeout=0.5)
-        except queue.Empty:
-            q.close()
-            q.join_thread()
-            return
+def discard_and_close_queue(q: mp.Queue):
+    """Close a queue that will not be read from again.
+
+    Items left in the queue are discarded instead of being read one by one,
+    and the feeder thread is not joined since it may be blocked on a full
+    pipe that nobody reads.
+    """
+    q.cancel_join_thread()
+    q.close()
 
 
 def generate_color_palette(n):
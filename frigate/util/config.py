@@ -1,15 +1,18 @@
 """configuration utils."""
 
 import asyncio
+import hashlib
 import logging
 import os
+import pickle
 import shutil
-from typing import Optional, Union
+from typing import Any, Iterable, Optional, Union
 
 from ruamel.yaml import YAML
 
 from frigate.const import CONFIG_DIR, EXPORT_DIR
 from frigate.util.services import get_video_properties
+from frigate.version import VERSION
 
 logger = logging.getLogger(__name__)
 
@@ -252,6 +255,121 @@ def migrate_015_0(config: dict[str, dict[str, any]]) -> dict[str, dict[str, any]
     return new_config
 
 
+def get_config_cache_path(config_file: str) -> str:
+    """Get the path of the parsed config cache for a config file."""
+    return os.path.join(
+        os.path.dirname(config_file), f".{os.path.basename(config_file)}.cache.pkl"
+    )
+
+
+def get_config_dependencies(config: Any) -> list[str]:
+    """Get the files besides the config file that are read while parsing it."""
+    # the labelmap of each model is merged into the model config when parsed,
+    # detectors left at their defaults are still plain dicts at this point
+    models = [config.model]
+
+    for detector in config.detectors.values():
+        if isinstance(detector, dict):
+            models.append(detector.get("model"))
+        else:
+            models.append(detector.model)
+
+    dependencies = set()
+
+    for model in models:
+        if model is None:
+            continue
+
+        if isinstance(model, dict):
+            labelmap_path = model.get("labelmap_path")
+        else:
+            labelmap_path = model.labelmap_path
+
+        dependencies.add(labelmap_path or "/labelmap.txt")
+
+    return sorted(dependencies)
+
+
+def get_file_signature(path: str) -> Optional[tuple[int, int]]:
+    """Get the modified time and size of a file, None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def get_config_cache_header(
+    config_file: str, dependencies: Iterable[str]
+) -> dict[str, Any]:
+    """Get the header used to validate a parsed config cache."""
+    stat = os.stat(config_file)
+
+    with open(config_file, "rb") as f:
+        file_hash = hashlib.sha256(f.read()).hexdigest()
+
+    return {
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "version": VERSION,
+        "hash": file_hash,
+        "dependencies": {path: get_file_signature(path) for path in dependencies},
+    }
+
+
+def load_cached_config(config_file: str) -> Optional[Any]:
+    """Load the parsed config if the cache matches the current config file."""
+    cache_path = get_config_cache_path(config_file)
+
+    if not os.path.isfile(cache_path):
+        return None
+
+    try:
+        with open(cache_path, "rb") as f:
+            # the header is pickled separately so a stale cache
+            # can be detected without loading the whole config
+            cached_header = pickle.load(f)
+            header = get_config_cache_header(config_file, cached_header["dependencies"])
+
+            if cached_header != header:
+                logger.debug("Config cache is stale, parsing config file...")
+                return None
+
+            return pickle.load(f)
+    except (
+        pickle.UnpicklingError,
+        AttributeError,
+        EOFError,
+        ImportError,
+        KeyError,
+        TypeError,
+        OSError,
+    ) as e:
+        logger.debug(f"Unable to load config cache: {e}")
+        return None
+
+
+def save_cached_config(config_file: str, config: Any) -> None:
+    """Save the parsed config so it can be reused on the next start."""
+    cache_path = get_config_cache_path(config_file)
+    tmp_path = f"{cache_path}.tmp"
+
+    try:
+        header = get_config_cache_header(config_file, get_config_dependencies(config))
+
+        with open(tmp_path, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(tmp_path, cache_path)
+    except (pickle.PicklingError, TypeError, AttributeError, OSError) as e:
+        logger.warning(f"Unable to save config cache: {e}")
+
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
 def get_relative_coordinates(
     mask: Optional[Union[str, list]], frame_shape: tuple[int, int]
 ) -> Union[str, list]:
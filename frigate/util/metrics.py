@@ -0,0 +1,93 @@
+"""Utils for sharing numeric metrics between processes."""
+
+from multiprocessing import shared_memory
+from typing import Optional, Union
+
+import numpy as np
+
+CAMERA_METRICS_DTYPE = np.dtype(
+    [
+        ("camera_fps", "f8"),
+        ("skipped_fps", "f8"),
+        ("process_fps", "f8"),
+        ("detection_fps", "f8"),
+        ("detection_frame", "f8"),
+        ("read_start", "f8"),
+        ("audio_rms", "f8"),
+        ("audio_dBFS", "f8"),
+        ("ptz_start_time", "f8"),
+        ("ptz_stop_time", "f8"),
+        ("ptz_frame_time", "f8"),
+        ("ptz_zoom_level", "f8"),
+        ("ptz_max_zoom", "f8"),
+        ("ptz_min_zoom", "f8"),
+        ("ffmpeg_pid", "i4"),
+        ("ptz_autotracker_enabled", "i4"),
+    ]
+)
+
+
+class SharedMetrics:
+    """Structured array stored in a single shared memory block.
+
+    Each row holds the metrics for one camera and each field is a column,
+    so every numeric metric lives in one allocation instead of a separate
+    mp.Value (and semaphore) per field.
+    """
+
+    def __init__(
+        self,
+        rows: int,
+        dtype: np.dtype = CAMERA_METRICS_DTYPE,
+        name: Optional[str] = None,
+    ) -> None:
+        self.rows = rows
+        self.dtype = np.dtype(dtype)
+
+        if name is None:
+            # new shared memory is zero filled
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=max(1, self.dtype.itemsize * rows)
+            )
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.array = np.ndarray((rows,), dtype=self.dtype, buffer=self.shm.buf)
+
+    def __getstate__(self) -> tuple[int, np.dtype, str]:
+        # attach to the same block by name instead of copying the data
+        return (self.rows, self.dtype, self.shm.name)
+
+    def __setstate__(self, state: tuple[int, np.dtype, str]) -> None:
+        rows, dtype, name = state
+        self.__init__(rows, dtype, name)
+
+    def value(self, row: int, field: str) -> "SharedMetric":
+        return SharedMetric(self, row, field)
+
+    def close(self, unlink: bool = False) -> None:
+        # the array must be released before the buffer can be closed
+        del self.array
+        self.shm.close()
+
+        if unlink:
+            self.shm.unlink()
+
+
+class SharedMetric:
+    """mp.Value compatible accessor for one field of a SharedMetrics row."""
+
+    __slots__ = ("metrics", "row", "field")
+
+    def __init__(self, metrics: SharedMetrics, row: int, field: str) -> None:
+        self.metrics = metrics
+        self.row = row
+        self.field = field
+
+    @property
+    def value(self) -> Union[int, float]:
+        return self.metrics.array[self.field][self.row].item()
+
+    @value.setter
+    def value(self, value: Union[int, float]) -> None:
+        self.metrics.array[self.field][self.row] = value
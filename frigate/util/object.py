@@ -78,41 +78,36 @@ def get_camera_regions_grid(
             ]
         )
         .where(Timeline.source_id << valid_event_ids)
+        .where(Timeline.source == "tracked_object")
         .limit(10000)
         .dicts()
     )
 
     logger.debug(f"Found {len(timeline)} new entries for {name}")
 
-    width = detect.width
-    height = detect.height
-
-    for t in timeline:
-        if t.get("source") != "tracked_object":
-            continue
-
-        box = t["data"]["box"]
+    if len(timeline) > 0:
+        width = detect.width
+        height = detect.height
+        boxes = np.array([t["data"]["box"] for t in timeline], dtype=np.float64)
 
         # calculate centroid position
-        x = box[0] + (box[2] / 2)
-        y = box[1] + (box[3] / 2)
-
-        x_pos = int(x * GRID_SIZE)
-        y_pos = int(y * GRID_SIZE)
-
-        calculated_region = calculate_region(
-            (height, width),
-            box[0] * width,
-            box[1] * height,
-            (box[0] + box[2]) * width,
-            (box[1] + box[3]) * height,
+        x_pos = ((boxes[:, 0] + boxes[:, 2] / 2) * GRID_SIZE).astype(int)
+        y_pos = ((boxes[:, 1] + boxes[:, 3] / 2) * GRID_SIZE).astype(int)
+
+        # same region size as calculate_region with a 1.35 multiplier,
+        # the region is square so its width is the region size
+        box_widths = (boxes[:, 0] + boxes[:, 2]) * width - boxes[:, 0] * width
+        box_heights = (boxes[:, 1] + boxes[:, 3]) * height - boxes[:, 1] * height
+        region_sizes = np.maximum(
+            np.maximum(box_widths, box_heights) * 1.35 // 4 * 4,
             min_region_size,
-            1.35,
-        )
+        ).astype(int)
+
         # save width of region to grid as relative
-        grid[x_pos][y_pos]["sizes"].append(
-            (calculated_region[2] - calculated_region[0]) / width
-        )
+        for x, y, size in zip(
+            x_pos.tolist(), y_pos.tolist(), (region_sizes / width).tolist()
+        ):
+            grid[x][y]["sizes"].append(size)
 
     for x in range(GRID_SIZE):
         for y in range(GRID_SIZE):
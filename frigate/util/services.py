@@ -44,6 +44,48 @@ def listen():
     signal.signal(signal.SIGUSR1, print_stack)
 
 
+def get_physical_cores() -> list[set[int]]:
+    """Group the cpus this process can run on by physical core."""
+    available = os.sched_getaffinity(0)
+    cores: list[set[int]] = []
+
+    for cpu in sorted(available):
+        if any(cpu in core for core in cores):
+            continue
+
+        try:
+            with open(
+                f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list"
+            ) as f:
+                siblings = set()
+
+                for part in f.read().strip().split(","):
+                    start, _, end = part.partition("-")
+                    siblings.update(range(int(start), int(end or start) + 1))
+        except (OSError, ValueError):
+            siblings = {cpu}
+
+        cores.append((siblings & available) or {cpu})
+
+    return cores
+
+
+def set_process_affinity(pid: int, cpus: set[int]) -> None:
+    """Restrict a process to the given cpus."""
+    try:
+        os.sched_setaffinity(pid, cpus)
+    except OSError as e:
+        logger.warning(f"Unable to set cpu affinity of process {pid}: {e}")
+
+
+def set_realtime_priority(pid: int, priority: int) -> None:
+    """Run a process with the SCHED_FIFO policy, requires CAP_SYS_NICE."""
+    try:
+        os.sched_setscheduler(pid, os.SCHED_FIFO, os.sched_param(priority))
+    except OSError as e:
+        logger.warning(f"Unable to set realtime priority of process {pid}: {e}")
+
+
 def get_cgroups_version() -> str:
     """Determine what version of cgroups is enabled."""
 
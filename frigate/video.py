@@ -841,15 +841,23 @@ def process_frames(
         else:
             fps_tracker.update()
             fps.value = fps_tracker.eps()
-            detected_objects_queue.put(
-                (
-                    camera_name,
-                    frame_time,
-                    detections,
-                    motion_boxes,
-                    regions,
+
+            try:
+                detected_objects_queue.put(
+                    (
+                        camera_name,
+                        frame_time,
+                        detections,
+                        motion_boxes,
+                        regions,
+                    )
                 )
-            )
+            except ValueError as e:
+                # the frame has too much data for a slot of the ring
+                logger.warning(f"{camera_name}: dropping frame {frame_time}: {e}")
+                frame_manager.delete(f"{camera_name}{frame_time}")
+                continue
+
             detection_fps.value = object_detector.fps.eps()
             frame_manager.close(f"{camera_name}{frame_time}")
 